@@ -0,0 +1,82 @@
+"""Game message canvas update CPU cost, per-call vs. cached caption and keyboard
+
+    python -m benchmarks.game_message
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Callable
+
+from aiogram import types
+from aiogram.utils.i18n import I18n
+
+from database import Game
+from services.messagetemplates import GameMessageTemplates
+
+LOCALES_PATH = Path(__file__).parent.parent / "locales"
+WEB_APP_URL = "https://t.me/DrawGuessrBot/app"
+
+GAME = Game(
+    id=1,
+    game_id="gameId__00000000-0000-0000-0000-000000000000",
+    group_id=-100,
+    message_id=1,
+    owner_id=42,
+    owner_name="Host",
+    word="word",
+    created_at=0,
+    finished=False,
+)
+
+
+def run(name: str, update: Callable[[], object], rounds: int) -> None:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        update()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<10} {elapsed / rounds * 1e6:>8.2f} us/update")
+
+
+def main(rounds: int, locale: str) -> None:
+    i18n = I18n(path=LOCALES_PATH, default_locale="en", domain="messages")
+    media = types.BufferedInputFile(b"", filename="canvas.jpg")
+
+    def per_call() -> object:
+        # Edit and resend, as built before templates
+        _ = i18n.gettext
+        for _attempt in range(2):
+            caption = _(
+                "<a href='tg://user?id={owner_id}'>{owner_name}</a> draws for guessing",
+                locale=locale,
+            ).format(owner_id=GAME.owner_id, owner_name=GAME.owner_name)
+            reply_markup = types.InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [
+                        types.InlineKeyboardButton(
+                            text=_("Start drawing", locale=locale),
+                            url=f"{WEB_APP_URL}?startapp={GAME.game_id}",
+                        )
+                    ]
+                ]
+            )
+            types.InputMediaPhoto(media=media, caption=caption)
+        return reply_markup
+
+    templates = GameMessageTemplates(i18n=i18n, web_app_url=WEB_APP_URL)
+    message = templates.build(GAME, locale)
+
+    def cached() -> object:
+        types.InputMediaPhoto(media=media, caption=message.caption)
+        return message.reply_markup
+
+    run("per call", per_call, rounds)
+    run("cached", cached, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--locale", default="ru")
+    args = parser.parse_args()
+
+    main(args.rounds, args.locale)
@@ -0,0 +1,64 @@
+"""Telegram Web App initData validations per second, with and without cache
+
+    python -m benchmarks.init_data
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import time
+from typing import Callable
+from urllib.parse import urlencode
+
+from aiogram.utils.web_app import safe_parse_webapp_init_data
+
+from services.initdatacache import InitDataCache
+
+TOKEN = "42:TEST"
+
+
+def signed_init_data(token: str) -> str:
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
+        "start_param": "gameId__00000000-0000-0000-0000-000000000000",
+        "user": json.dumps(
+            {"id": 42, "first_name": "Host", "language_code": "en"},
+            separators=(",", ":"),
+        ),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(
+        secret_key, data_check_string.encode(), hashlib.sha256
+    ).hexdigest()
+    return urlencode(fields)
+
+
+def run(name: str, parse: Callable[[str], object], init_data: str, rounds: int) -> None:
+    assert parse(init_data) is not None
+    started = time.perf_counter()
+    for _ in range(rounds):
+        parse(init_data)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<10} {rounds / elapsed:>12,.0f} validations/s")
+
+
+def main(rounds: int) -> None:
+    init_data = signed_init_data(TOKEN)
+
+    run(
+        "no cache",
+        lambda raw: safe_parse_webapp_init_data(token=TOKEN, init_data=raw),
+        init_data,
+        rounds,
+    )
+    run("cache", InitDataCache(token=TOKEN).parse, init_data, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=100_000)
+    args = parser.parse_args()
+
+    main(args.rounds)
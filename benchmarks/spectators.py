@@ -0,0 +1,179 @@
+"""Spectator SSE fan-out on one worker: thousands of subscribers of one game
+
+Serves `BroadcastHub` frames over loopback HTTP the way `/web/app/watch` does.
+A share of spectators reads slowly to exercise drop-oldest backpressure,
+socket buffers are shrunk to mobile-like sizes, so loopback doesn't absorb the backlog:
+
+    python -m benchmarks.spectators --spectators 2000
+"""
+import argparse
+import asyncio
+import json
+import resource
+import socket
+import statistics
+import time
+from typing import List
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, web
+from aiohttp_sse import sse_response
+
+from services.broadcast import BroadcastHub, encode_sse
+from services.strokelog import MAX_BATCH_POINTS
+
+GAME_ID = "gameId__bench"
+SOCKET_BUFFER_BYTES = 16 * 1024
+
+
+def strokes_batch(sent_at: float) -> str:
+    points = [v for i in range(MAX_BATCH_POINTS) for v in (i % 400, i // 2 % 700)]
+    return json.dumps(
+        {
+            "strokes": [{"c": "#000000", "s": 3.0, "p": points}],
+            "width": 400,
+            "height": 700,
+            "sent_at": sent_at,
+        }
+    )
+
+
+def encoding_cost(spectators: int, rounds: int) -> None:
+    data = strokes_batch(0)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for _ in range(spectators):
+            encode_sse("strokes", data)
+    per_subscriber = (time.perf_counter() - started) / rounds
+    started = time.perf_counter()
+    for _ in range(rounds):
+        encode_sse("strokes", data)
+    once = (time.perf_counter() - started) / rounds
+    print(
+        f"encode per event: per subscriber {per_subscriber * 1e3:.2f}ms, "
+        f"once {once * 1e3:.3f}ms"
+    )
+
+
+async def watch_handler(request: web.Request) -> web.StreamResponse:
+    hub: BroadcastHub = request.app["hub"]
+    subscriber = hub.subscribe(GAME_ID)
+    if subscriber is None:
+        return web.Response(status=429)
+    sock = request.transport.get_extra_info("socket") if request.transport else None
+    if sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_BYTES)
+    async with sse_response(request) as resp:
+        try:
+            while (frame := await subscriber.get()) is not None:
+                await resp.write(frame)
+        except ConnectionResetError:
+            pass
+        finally:
+            hub.unsubscribe(GAME_ID, subscriber)
+    return resp
+
+
+async def spectate(
+    session: ClientSession, url: str, read_delay_sec: float, lags: List[float]
+) -> int:
+    received = 0
+    async with session.get(url) as resp:
+        if resp.connection and resp.connection.transport:
+            sock = resp.connection.transport.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_BYTES)
+        async for line in resp.content:
+            if line.startswith(b"event: error"):
+                break
+            if not line.startswith(b"data: "):
+                continue
+            received += 1
+            lags.append(time.time() - json.loads(line[6:])["sent_at"])
+            if read_delay_sec:
+                await asyncio.sleep(read_delay_sec)
+    return received
+
+
+async def main(
+    spectators: int, events: int, interval_sec: float, slow_share: float, queue_size: int
+) -> None:
+    hub = BroadcastHub(max_subscribers=spectators, queue_size=queue_size)
+    app = web.Application()
+    app["hub"] = hub
+    app.router.add_get("/watch", watch_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    slow = int(spectators * slow_share)
+    fast_lags: List[float] = []
+    slow_lags: List[float] = []
+    async with ClientSession(
+        connector=TCPConnector(limit=0), timeout=ClientTimeout(total=None)
+    ) as session:
+        clients = [
+            asyncio.create_task(
+                spectate(
+                    session,
+                    f"http://127.0.0.1:{port}/watch",
+                    interval_sec * 10 if i < slow else 0,
+                    slow_lags if i < slow else fast_lags,
+                )
+            )
+            for i in range(spectators)
+        ]
+        while hub.subscribers(GAME_ID) < spectators:
+            await asyncio.sleep(0.1)
+        print(f"{spectators} spectators connected, {slow} slow")
+
+        publish_timings = []
+        cpu_started = time.process_time()
+        for _ in range(events):
+            started = time.perf_counter()
+            hub.publish(GAME_ID, "strokes", lambda: strokes_batch(time.time()))
+            publish_timings.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(interval_sec)
+
+        hub.close(GAME_ID, "error", "ended")
+        received = await asyncio.gather(*clients)
+        cpu = time.process_time() - cpu_started
+
+    await runner.cleanup()
+
+    expected = spectators * events
+    print(
+        f"publish p50={statistics.median(publish_timings):.3f}ms "
+        f"max={max(publish_timings):.3f}ms per event"
+    )
+    print(
+        f"delivered {sum(received)}/{expected} frames, "
+        f"dropped {expected - sum(received)}"
+    )
+    for name, lags in (("fast", fast_lags), ("slow", slow_lags)):
+        if len(lags) < 2:
+            continue
+        quantiles = statistics.quantiles(lags, n=100)
+        print(
+            f"{name} spectators delivery lag "
+            f"p50={quantiles[49] * 1e3:.1f}ms p99={quantiles[98] * 1e3:.1f}ms"
+        )
+    print(
+        f"process CPU {cpu:.2f}s (server and clients), "
+        f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MiB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spectators", type=int, default=2_000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--slow-share", type=float, default=0.1)
+    parser.add_argument("--queue-size", type=int, default=8)
+    args = parser.parse_args()
+
+    encoding_cost(args.spectators, rounds=5)
+    asyncio.run(
+        main(args.spectators, args.events, args.interval, args.slow_share, args.queue_size)
+    )
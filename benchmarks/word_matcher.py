@@ -0,0 +1,53 @@
+"""Group message word checks per second on a single core
+
+    python -m benchmarks.word_matcher
+"""
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from services.wordmatcher import WordMatcher
+
+WORDS_PATH = Path(__file__).parent.parent / "resources" / "words" / "en.txt"
+
+
+def run(name: str, check: Callable[[str], bool], messages: List[str]) -> None:
+    started = time.perf_counter()
+    matched = sum(1 for message in messages if check(message))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<16} {len(messages) / elapsed:>12,.0f} msg/s "
+        f"({matched} matched)"
+    )
+
+
+def main(messages_count: int, hit_ratio: float) -> None:
+    words = [w.strip() for w in WORDS_PATH.read_text().splitlines() if w.strip()]
+    rnd = random.Random(42)
+    word = rnd.choice(words)
+
+    messages = []
+    for _ in range(messages_count):
+        message = " ".join(rnd.choices(words, k=rnd.randint(1, 12)))
+        if rnd.random() < hit_ratio:
+            message = f"{message} {word.upper()}!"
+        messages.append(message)
+
+    regex = re.compile(word, re.IGNORECASE)
+    run("re.match", lambda text: regex.match(text) is not None, messages)
+
+    matcher = WordMatcher()
+    matcher.add("game", word)
+    run("WordMatcher", lambda text: matcher.match("game", text), messages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--hit-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+
+    main(args.messages, args.hit_ratio)
@@ -9,10 +9,3 @@ def await_for(coro) -> Any:
     loop.run_until_complete(task)
     return task.result()
 
-
-async def aenumerate(asequence, start=0):
-    """Asynchronously enumerate an async iterator from a given start value"""
-    n = start
-    async for elem in asequence:
-        yield n, elem
-        n += 1
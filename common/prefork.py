@@ -0,0 +1,83 @@
+import multiprocessing
+import signal
+import socket
+import time
+from multiprocessing.connection import wait
+from multiprocessing.process import BaseProcess
+from typing import Callable, Dict
+
+from logger import logger
+
+
+def reuse_port_socket(host: str, port: int) -> socket.socket:
+    """Create socket bound with `SO_REUSEPORT`, so every worker process
+    can bind own socket to the same port and the kernel balances connections
+
+    Args:
+        host (str): Host
+        port (int): Port
+
+    Returns:
+        socket.socket: Bound socket
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def run_workers(
+    target: Callable[[int], None],
+    workers: int,
+    restart_delay_sec: float = 1,
+    stop_timeout_sec: float = 30,
+) -> None:
+    """Run [workers] processes of [target] and restart crashed ones until SIGINT/SIGTERM
+
+    Args:
+        target (Callable[[int], None]): Worker entrypoint, receives worker index
+        workers (int): Workers count
+        restart_delay_sec (float, optional): Delay before restarting crashed worker. Defaults to 1.
+        stop_timeout_sec (float, optional): Graceful stop timeout. Defaults to 30.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes: Dict[int, BaseProcess] = {}
+    stopping = False
+
+    def stop(*_) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    def spawn(worker_idx: int) -> None:
+        process = context.Process(
+            target=target, args=(worker_idx,), name=f"worker-{worker_idx}"
+        )
+        process.start()
+        processes[worker_idx] = process
+        logger.info(f"Worker {worker_idx} started, pid {process.pid}")
+
+    for worker_idx in range(workers):
+        spawn(worker_idx)
+
+    while not stopping:
+        wait([process.sentinel for process in processes.values()], timeout=1)
+        for worker_idx, process in list(processes.items()):
+            if stopping or process.is_alive():
+                continue
+            logger.warning(
+                f"Worker {worker_idx} exited with code {process.exitcode}, restarting"
+            )
+            time.sleep(restart_delay_sec)
+            spawn(worker_idx)
+
+    for process in processes.values():
+        process.terminate()
+    deadline = time.monotonic() + stop_timeout_sec
+    for process in processes.values():
+        process.join(max(0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
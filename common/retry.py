@@ -1,4 +1,8 @@
-from typing import Protocol, Tuple, Type, Union
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Protocol, Tuple, Type, Union
 
 Exception_Type = Type[Exception]
 
@@ -7,22 +11,94 @@ class TooManyTriesException(RuntimeError):
     pass
 
 
+class RetryBudget:
+    def __init__(self, rate: float = 10, capacity: float = 50) -> None:
+        """Token bucket of retries shared by all decorated functions,
+        so outage doesn't turn every in-flight call into a retry storm
+
+        Args:
+            rate (float, optional): Retries refilled per second. Defaults to 10.
+            capacity (float, optional): Retries burst. Defaults to 50.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_spend(self) -> bool:
+        """Take one retry token, `False` if budget is exhausted"""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class RetryStats:
+    # Retried failures
+    retries: int = 0
+    # Calls failed after all tries
+    exhausted: int = 0
+    # Calls failed early, retry budget is exhausted
+    budget_exhausted: int = 0
+
+
+# Process-wide budget and counters, per decorated function
+retry_budget = RetryBudget()
+retry_stats: Dict[str, RetryStats] = {}
+
+
 def retry(
-    expects: Union[Exception_Type, Tuple[Exception_Type]] = Exception, times: int = 3
+    expects: Union[Exception_Type, Tuple[Exception_Type]] = Exception,
+    times: int = 3,
+    base_delay_sec: float = 0.05,
+    max_delay_sec: float = 2,
+    budget: Optional[RetryBudget] = None,
 ):
-    """Retry decorator for async functions"""
+    """Retry decorator for async functions
+
+    Delays between tries grow exponentially with full jitter,
+    every retry spends a token of [budget].
+
+    Args:
+        expects (Union[Exception_Type, Tuple[Exception_Type]], optional): Retried exceptions.
+        Defaults to Exception.
+        times (int, optional): Tries. Defaults to 3.
+        base_delay_sec (float, optional): First retry delay limit. Defaults to 0.05.
+        max_delay_sec (float, optional): Retry delay limit. Defaults to 2.
+        budget (Optional[RetryBudget], optional): Retry budget.
+        Defaults to process-wide `retry_budget`.
+    """
 
     def func_wrapper(f):
         from functools import wraps
 
+        stats = retry_stats.setdefault(f.__qualname__, RetryStats())
+
         @wraps(f)
         async def wrapper(*args, **kwargs):
             exception = None
-            for _ in range(times):
+            for attempt in range(times):
                 try:
                     return await f(*args, **kwargs)
                 except expects as ex:
                     exception = ex
+
+                if attempt + 1 == times:
+                    break
+                if not (budget or retry_budget).try_spend():
+                    stats.budget_exhausted += 1
+                    break
+                stats.retries += 1
+                await asyncio.sleep(
+                    random.uniform(0, min(max_delay_sec, base_delay_sec * 2**attempt))
+                )
+            stats.exhausted += 1
             raise TooManyTriesException(exception) from exception
 
         return wrapper
@@ -31,14 +107,21 @@ def retry(
 
 
 class AsyncRetryProtocol(type(Protocol)):
-    """Decorate public async class methods with retry decorator"""
+    """Decorate public async class methods with retry decorator
 
-    def __new__(cls, name, bases, attrs, **kwargs):
-        import asyncio
+    Class kwargs are `retry` arguments, `exclude` lists methods left as is
+    and `overrides` maps method names to their own `retry` arguments, e.g.
+    `overrides={"sql": {"times": 1}}`.
+    """
 
+    def __new__(cls, name, bases, attrs, **kwargs):
         exclude = kwargs.get("exclude", [])
-        expects = kwargs.get("expects", Exception)
-        times = kwargs.get("times", 3)
+        overrides: Dict[str, Dict[str, Any]] = kwargs.get("overrides", {})
+        retry_kwargs = {
+            key: value
+            for key, value in kwargs.items()
+            if key not in ("exclude", "overrides")
+        }
 
         for attr_name, attr_value in attrs.items():
             if (
@@ -46,7 +129,8 @@ class AsyncRetryProtocol(type(Protocol)):
                 and attr_name not in exclude
                 and asyncio.iscoroutinefunction(attr_value)
             ):
-                attrs[attr_name] = (
-                    retry(expects=expects, times=times))(attr_value)
+                attrs[attr_name] = retry(
+                    **{**retry_kwargs, **overrides.get(attr_name, {})}
+                )(attr_value)
 
         return super(AsyncRetryProtocol, cls).__new__(cls, name, bases, attrs)
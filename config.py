@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,11 +14,50 @@ class Settings(BaseSettings):
     telegram_bot_web_app_url: str
 
     db_url: SecretStr
+    # Connections opened at startup and kept while idle
+    db_pool_min_size: int = 4
+    db_pool_max_size: int = 50
+    db_pool_timeout_sec: float = 30
+    db_pool_max_idle_sec: float = 600
+    db_pool_check_interval_sec: float = 30
+    # Finished games history kept in monthly archive partitions
+    games_archive_retention_months: int = 12
+    games_archive_compaction_interval_sec: float = 3600
+    # Active games without canvas updates and subscribers are finished after TTL
+    stale_game_ttl_sec: float = 1800
+    stale_game_sweep_interval_sec: float = 60
+    stale_game_sweep_limit: int = 100
+    # Game events bus: "memory" - single process, "postgres" - LISTEN/NOTIFY
+    event_bus: Literal["memory", "postgres"] = "memory"
 
     host: str
     port: int
-
-    initial_canvas_file_id: str
+    # Server processes sharing the port, more than 1 implies postgres event bus
+    workers: int = 1
+
+    # Uploaded from resources/empty_canvas.jpg on first game when not set
+    initial_canvas_file_id: Optional[str] = None
+
+    # At most one game message photo edit per interval, per game
+    canvas_update_interval_sec: float = 3
+    # Game message photo rendered from host strokes
+    canvas_image_side: int = 800
+    canvas_image_format: Literal["JPEG", "WEBP"] = "JPEG"
+    canvas_image_quality: int = 80
+    # Uploaded canvas images are downscaled and recompressed into byte budget
+    canvas_image_max_bytes: int = 256 * 1024
+    image_pipeline_workers: int = 1
+
+    # Outbound Telegram API calls budgets. Global one is split between workers.
+    # Group one is per worker: game message photo edits are sent by one worker,
+    # game text messages by the worker handling the update
+    telegram_global_rate_per_sec: float = 25
+    telegram_group_rate_per_min: float = 20
+
+    # Mini app spectators, per game and process
+    spectators_per_game_limit: int = 5_000
+    # Pending strokes batches per spectator, the oldest are dropped beyond
+    spectator_queue_size: int = 32
 
 
 config = Settings()
@@ -1,6 +1,6 @@
 from abc import abstractmethod
-from dataclasses import dataclass
-from typing import Any, List, Optional, Protocol, Sequence, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
 
 
 @dataclass
@@ -24,6 +24,27 @@ class Game:
     finished: bool
 
 
+@dataclass
+class WordDeck:
+    group_id: int
+    locale: str
+    seed: int
+    position: int
+    size: int
+
+
+@dataclass
+class ArchiveCompaction:
+    # Created partitions
+    created: List[str] = field(default_factory=list)
+    # Dropped partitions, out of retention
+    dropped: List[str] = field(default_factory=list)
+    # Rows moved out of default partition
+    moved: int = 0
+    # Rows deleted from default partition, out of retention
+    deleted: int = 0
+
+
 class Database(Protocol):
     @abstractmethod
     async def _async__init__(self: "Database") -> "Database":
@@ -42,6 +63,10 @@ class Database(Protocol):
         """Close connection pool"""
         raise NotImplementedError
 
+    def pool_stats(self: "Database") -> Dict[str, int]:
+        """Connection pool statistics"""
+        return {}
+
     @abstractmethod
     async def sql(
         self: "Database", sql: str, params: Optional[Sequence[Any]] = None
@@ -65,8 +90,8 @@ class Database(Protocol):
         owner_id: int,
         owner_name: str,
         word: str,
-    ) -> Game:
-        """Create new game"""
+    ) -> Optional[Game]:
+        """Create new game, `None` if group already has active game"""
         raise NotImplementedError
 
     async def get_game(self: "Database", game_id: str) -> Optional[Game]:
@@ -77,6 +102,10 @@ class Database(Protocol):
         """Get current group game"""
         raise NotImplementedError
 
+    async def get_active_games(self: "Database") -> List[Game]:
+        """Get all not finished games"""
+        raise NotImplementedError
+
     async def update_game_message(
         self: "Database", game_id: int, new_message_id: int
     ) -> None:
@@ -86,7 +115,17 @@ class Database(Protocol):
     async def game_finished(
         self: "Database", game_id: int
     ) -> None:
-        """Update finished game: delete"""
+        """Update finished game: move to archive"""
+        raise NotImplementedError
+
+    async def finish_games(self: "Database", game_ids: Sequence[int]) -> List[int]:
+        """Finish games in bulk: move to archive, returns actually finished ids"""
+        raise NotImplementedError
+
+    async def compact_games_archive(
+        self: "Database", retention_months: int
+    ) -> ArchiveCompaction:
+        """Maintain games archive, drop history older than [retention_months]"""
         raise NotImplementedError
 
     async def delete_games(
@@ -94,3 +133,11 @@ class Database(Protocol):
     ) -> None:
         """Delete all games in group"""
         raise NotImplementedError
+
+    async def draw_word_deck(
+        self: "Database", group_id: int, locale: str, size: int, seed: int
+    ) -> WordDeck:
+        """Advance group words deck cursor in one atomic step, shared by all processes.
+        Deck is created or reshuffled with [seed] when exhausted or words [size] changed,
+        drawn word is at `position - 1`"""
+        raise NotImplementedError
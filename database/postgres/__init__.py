@@ -1,46 +1,110 @@
+import asyncio
 import datetime
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
+from cachetools import TTLCache
 from psycopg import AsyncCursor, errors
 from psycopg.rows import class_row
 from psycopg_pool import AsyncConnectionPool
 
 from common.retry import AsyncRetryProtocol
-from database import Database, Game, User
+from database import ArchiveCompaction, Database, Game, User, WordDeck
+from database.postgres.archive import compact_archive
+from database.postgres.migrations import migrate
+from logger import logger
 
 
 class PsycopgDatabase(
-    Database, metaclass=AsyncRetryProtocol, expects=errors.OperationalError
+    Database,
+    metaclass=AsyncRetryProtocol,
+    expects=errors.OperationalError,
+    # Plain sql may be not idempotent, e.g. event bus notifications
+    overrides={"sql": {"times": 1}},
 ):
-    MIN_CONN = 1
+    MIN_CONN = 4
     MAX_CONN = 50
+    POOL_TIMEOUT_SEC = 30
+    POOL_MAX_IDLE_SEC = 600
+    HEALTH_CHECK_INTERVAL_SEC = 30
+    USERS_CACHE_SIZE = 10_000
+    # Bounds staleness of user bans, the only cache invalidation path
+    USERS_CACHE_TTL_SEC = 300
 
     def __init__(
         self,
         connection_string: str,
         min_conn: int = MIN_CONN,
         max_conn: int = MAX_CONN,
+        pool_timeout_sec: float = POOL_TIMEOUT_SEC,
+        pool_max_idle_sec: float = POOL_MAX_IDLE_SEC,
+        health_check_interval_sec: float = HEALTH_CHECK_INTERVAL_SEC,
+        users_cache_size: int = USERS_CACHE_SIZE,
+        users_cache_ttl_sec: float = USERS_CACHE_TTL_SEC,
+        prepare: bool = True,
         **kwargs: Any
     ) -> "PsycopgDatabase":
+        """
+        Args:
+            min_conn (int, optional): Connections opened at startup and kept while idle.
+            Defaults to 4.
+            max_conn (int, optional): Connections limit. Defaults to 50.
+            pool_timeout_sec (float, optional): Connection wait limit. Defaults to 30.
+            pool_max_idle_sec (float, optional): Idle connections above [min_conn]
+            are closed after. Defaults to 600.
+            health_check_interval_sec (float, optional): Background pool check interval,
+            checks also run right after connection errors. Defaults to 30.
+            prepare (bool, optional): Use server-side prepared statements for hot queries,
+            disable behind transaction-pooling proxies. Defaults to True.
+        """
         self.__conn_info = connection_string
+        self.__prepare = prepare
         self.__min_conn = min_conn
         self.__max_conn = max_conn
+        self.__pool_timeout_sec = pool_timeout_sec
+        self.__pool_max_idle_sec = pool_max_idle_sec
+        self.__health_check_interval_sec = health_check_interval_sec
+        self.__health_check_requested = asyncio.Event()
+        self.__health_checker: Optional[asyncio.Task] = None
+        self.__health_check_errors = 0
         self.__kwargs = kwargs
+        self.__users = TTLCache[int, User](
+            maxsize=users_cache_size, ttl=users_cache_ttl_sec
+        )
 
     async def _async__init__(self: "PsycopgDatabase") -> "PsycopgDatabase":
         self.connection_pool = AsyncConnectionPool(
             conninfo=self.__conn_info,
             min_size=self.__min_conn,
             max_size=self.__max_conn,
+            timeout=self.__pool_timeout_sec,
+            max_idle=self.__pool_max_idle_sec,
+            open=False,
             **self.__kwargs
         )
-        await self.__create_db_if_not_exists()
+        # Warm up: first burst doesn't pay connection setup
+        await self.connection_pool.open(wait=True, timeout=self.__pool_timeout_sec)
+        await self.__migrate()
+        self.__health_checker = asyncio.create_task(self.__check_health())
         return self
 
     async def close(self: "PsycopgDatabase") -> None:
+        if self.__health_checker:
+            self.__health_checker.cancel()
+            await asyncio.gather(self.__health_checker, return_exceptions=True)
+            self.__health_checker = None
         await self.connection_pool.close()
 
+    def pool_stats(self: "PsycopgDatabase") -> Dict[str, int]:
+        """Connection pool statistics, counters are reset by each call,
+        see `psycopg_pool` `pop_stats()`"""
+        stats = self.connection_pool.pop_stats()
+        stats["connections_in_use"] = stats.get("pool_size", 0) - stats.get(
+            "pool_available", 0
+        )
+        stats["health_check_errors"] = self.__health_check_errors
+        return stats
+
     async def sql(
         self: "PsycopgDatabase", sql: str, params: Optional[Sequence[Any]] = None
     ) -> List[Any]:
@@ -55,48 +119,30 @@ class PsycopgDatabase(
     async def get_user_or_create(
         self: "PsycopgDatabase", user_id: int
     ) -> Tuple[User, bool]:
-        """Get or create user"""
-        user_created = False
+        """Get or create user, known users are served from cache"""
+        user = self.__users.get(user_id)
+        if user is not None:
+            return user, False
 
         async with self.__pg_cursor() as cursor:
-            cursor.row_factory = class_row(User)
+            # No-op update locks and returns existing row, `xmax = 0` for inserted one
             await cursor.execute(
                 """
-                SELECT users.id, users.telegram_id,
-                users.banned, users.available_for_broadcast
-                FROM users
-                WHERE users.telegram_id = %s
+                INSERT INTO users (telegram_id, created_at) VALUES (%s, %s)
+                ON CONFLICT (telegram_id) DO UPDATE
+                SET telegram_id = EXCLUDED.telegram_id
+                RETURNING users.id, users.telegram_id,
+                users.banned, users.available_for_broadcast,
+                (xmax = 0) AS created
                 """,
-                (user_id,),
+                (user_id, self.__current_timestamp()),
+                prepare=self.__prepare,
             )
-            user: Optional[User] = await cursor.fetchone()
+            *fields, created = await cursor.fetchone()
 
-            if not user:
-                created_at = self.__current_timestamp()
-                await cursor.execute(
-                    """
-                    INSERT INTO users (telegram_id, created_at) VALUES (%s, %s)
-                    """,
-                    (
-                        user_id,
-                        created_at,
-                    ),
-                )
-
-                await cursor.execute(
-                    """
-                    SELECT users.id, users.telegram_id,
-                    users.banned, users.available_for_broadcast
-                    FROM users
-                    WHERE users.telegram_id = %s
-                    """,
-                    (user_id,),
-                )
-
-                user: User = await cursor.fetchone()
-                user_created = True
-
-        return user, user_created
+        user = User(*fields)
+        self.__users[user_id] = user
+        return user, created
 
     async def get_users(self: "PsycopgDatabase") -> List[User]:
         """Get all users"""
@@ -120,26 +166,30 @@ class PsycopgDatabase(
         owner_id: int,
         owner_name: str,
         word: str,
-    ) -> Game:
-        """Create new game"""
+    ) -> Optional[Game]:
+        """Create new game, `None` if group already has active game"""
         created_at = self.__current_timestamp()
-        async with self.__pg_cursor() as cursor:
-            await cursor.execute(
-                """
-                INSERT INTO games (game_id, group_id, owner_id, owner_name, word, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (
-                    game_id,
-                    group_id,
-                    owner_id,
-                    owner_name,
-                    word,
-                    created_at,
-                ),
-            )
-            internal_game_id: int = (await cursor.fetchone())[0]
+        try:
+            async with self.__pg_cursor() as cursor:
+                await cursor.execute(
+                    """
+                    INSERT INTO games (game_id, group_id, owner_id, owner_name, word, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                    """,
+                    (
+                        game_id,
+                        group_id,
+                        owner_id,
+                        owner_name,
+                        word,
+                        created_at,
+                    ),
+                    prepare=self.__prepare,
+                )
+                internal_game_id: int = (await cursor.fetchone())[0]
+        except errors.UniqueViolation:
+            return None
 
         return Game(
             id=internal_game_id,
@@ -169,6 +219,7 @@ class PsycopgDatabase(
                 LIMIT 1
                 """,
                 (game_id,),
+                prepare=self.__prepare,
             )
             game = await cursor.fetchone()
 
@@ -191,11 +242,31 @@ class PsycopgDatabase(
                 LIMIT 1
                 """,
                 (group_id,),
+                prepare=self.__prepare,
             )
             game = await cursor.fetchone()
 
         return game
 
+    async def get_active_games(self: "PsycopgDatabase") -> List[Game]:
+        """Get all not finished games"""
+        async with self.__pg_cursor() as cursor:
+            cursor.row_factory = class_row(Game)
+            await cursor.execute(
+                """
+                SELECT games.id, games.game_id,
+                games.group_id, games.message_id,
+                games.owner_id, games.owner_name,
+                games.word, games.created_at, games.finished
+                FROM games
+                WHERE games.finished IS NOT TRUE
+                ORDER BY id ASC
+                """
+            )
+            result: List[Game] = await cursor.fetchall()
+
+        return result
+
     async def update_game_message(
         self: "PsycopgDatabase", game_id: int, new_message_id: int
     ) -> None:
@@ -208,20 +279,66 @@ class PsycopgDatabase(
                 WHERE id = %s
                 """,
                 (new_message_id, game_id),
+                prepare=self.__prepare,
             )
 
     async def game_finished(
         self: "PsycopgDatabase", game_id: int
     ) -> None:
-        """Update finished game: delete"""
+        """Update finished game: move to archive"""
         async with self.__pg_cursor() as cursor:
             await cursor.execute(
                 """
-                DELETE FROM games
-                WHERE id = %s
+                WITH finished AS (
+                    DELETE FROM games
+                    WHERE id = %s
+                    RETURNING id, game_id, group_id, message_id,
+                    owner_id, owner_name, word, created_at
+                )
+                INSERT INTO games_archive (id, game_id, group_id, message_id,
+                owner_id, owner_name, word, created_at, finished_at)
+                SELECT id, game_id, group_id, message_id,
+                owner_id, owner_name, word, created_at, %s
+                FROM finished
+                """,
+                (game_id, self.__current_timestamp()),
+                prepare=self.__prepare,
+            )
+
+    async def finish_games(
+        self: "PsycopgDatabase", game_ids: Sequence[int]
+    ) -> List[int]:
+        """Finish games in bulk: move to archive, returns actually finished ids"""
+        if not game_ids:
+            return []
+        async with self.__pg_cursor() as cursor:
+            await cursor.execute(
+                """
+                WITH finished AS (
+                    DELETE FROM games
+                    WHERE id = ANY(%s)
+                    RETURNING id, game_id, group_id, message_id,
+                    owner_id, owner_name, word, created_at
+                )
+                INSERT INTO games_archive (id, game_id, group_id, message_id,
+                owner_id, owner_name, word, created_at, finished_at)
+                SELECT id, game_id, group_id, message_id,
+                owner_id, owner_name, word, created_at, %s
+                FROM finished
+                RETURNING id
                 """,
-                (game_id, ),
+                (list(game_ids), self.__current_timestamp()),
             )
+            result: List[int] = [row[0] for row in await cursor.fetchall()]
+
+        return result
+
+    async def compact_games_archive(
+        self: "PsycopgDatabase", retention_months: int
+    ) -> ArchiveCompaction:
+        """Maintain games archive partitions, drop history out of retention"""
+        async with self.connection_pool.connection() as con:
+            return await compact_archive(con, retention_months=retention_months)
 
     async def delete_games(
         self: "PsycopgDatabase", group_id: int
@@ -236,38 +353,78 @@ class PsycopgDatabase(
                 (group_id, ),
             )
 
-    async def __create_db_if_not_exists(self: "PsycopgDatabase"):
-        """Create tables if not exists"""
-
+    async def draw_word_deck(
+        self: "PsycopgDatabase", group_id: int, locale: str, size: int, seed: int
+    ) -> WordDeck:
+        """Advance group words deck cursor, drawn word is at `position - 1`"""
         async with self.__pg_cursor() as cursor:
+            cursor.row_factory = class_row(WordDeck)
+            # Row lock serializes concurrent draws of all processes,
+            # SET expressions see the row before update
             await cursor.execute(
                 """
-                CREATE TABLE IF NOT EXISTS users(   
-                    id serial primary key not null,
-                    telegram_id bigint not null unique,
-                    created_at bigint not null,
-                    banned boolean not null default false,
-                    available_for_broadcast boolean not null default true
-                );
-
-                CREATE TABLE IF NOT EXISTS games(   
-                    id serial primary key not null,
-                    game_id varchar(128) not null,
-                    group_id bigint not null,
-                    message_id bigint not null default 0,
-                    owner_id bigint not null,
-                    owner_name varchar(128) not null,
-                    word varchar(128) not null,
-                    created_at bigint not null,
-                    finished boolean not null default false
-                );
-                """
+                INSERT INTO word_decks (group_id, locale, seed, position, size)
+                VALUES (%(group_id)s, %(locale)s, %(seed)s, 1, %(size)s)
+                ON CONFLICT (group_id, locale) DO UPDATE
+                SET seed = CASE
+                    WHEN word_decks.size = EXCLUDED.size
+                    AND word_decks.position < word_decks.size
+                    THEN word_decks.seed ELSE EXCLUDED.seed END,
+                position = CASE
+                    WHEN word_decks.size = EXCLUDED.size
+                    AND word_decks.position < word_decks.size
+                    THEN word_decks.position + 1 ELSE 1 END,
+                size = EXCLUDED.size
+                RETURNING group_id, locale, seed, position, size
+                """,
+                {"group_id": group_id, "locale": locale, "seed": seed, "size": size},
+                prepare=self.__prepare,
             )
+            deck: WordDeck = await cursor.fetchone()
+
+        return deck
+
+    async def __migrate(self: "PsycopgDatabase") -> None:
+        """Apply pending schema migrations"""
+        async with self.connection_pool.connection() as con:
+            await migrate(con)
 
     def __current_timestamp(self) -> int:
         """Returns current UTC timestamp, in sec"""
         return int(datetime.datetime.now(datetime.timezone.utc).timestamp())
 
+    async def __check_health(self: "PsycopgDatabase") -> None:
+        """Check idle pool connections and log pool statistics since previous check,
+        periodically and after connection errors"""
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self.__health_check_requested.wait(),
+                    timeout=self.__health_check_interval_sec,
+                )
+            self.__health_check_requested.clear()
+            try:
+                await self.connection_pool.check()
+            except Exception:
+                self.__health_check_errors += 1
+                logger.exception("Database pool check failed")
+
+            stats = self.pool_stats()
+            queued = stats.get("requests_queued", 0)
+            summary = (
+                f"{stats['connections_in_use']}/{stats.get('pool_size', 0)} connections "
+                f"in use, {stats.get('requests_waiting', 0)} requests waiting, "
+                f"{stats.get('requests_num', 0)} requests, {queued} queued "
+                f"for {stats.get('requests_wait_ms', 0) / max(queued, 1):.0f}ms avg, "
+                f"{stats.get('requests_errors', 0)} request errors, "
+                f"{stats.get('connections_errors', 0)} connection errors, "
+                f"{stats['health_check_errors']} check errors total"
+            )
+            if stats.get("requests_waiting", 0):
+                logger.warning(f"Database pool is exhausted: {summary}")
+            else:
+                logger.info(f"Database pool: {summary}")
+
     @asynccontextmanager
     async def __pg_cursor(self: "PsycopgDatabase") -> AsyncIterator[AsyncCursor[Any]]:
         """
@@ -280,8 +437,8 @@ class PsycopgDatabase(
                 async with con.cursor() as cur:
                     yield cur
             except errors.OperationalError as e:
-                # If we get an operational error check the pool
-                await self.connection_pool.check()
+                # If we get an operational error check the pool, in background
+                self.__health_check_requested.set()
                 raise e
             except errors.DatabaseError as e:
                 if con is not None:
@@ -0,0 +1,175 @@
+import datetime
+from typing import Any, List, NamedTuple, Optional
+
+from psycopg import AsyncConnection, AsyncCursor, sql
+
+from database import ArchiveCompaction
+
+ARCHIVE_PARTITION_PREFIX = "games_archive_p"
+# Arbitrary key: serializes concurrent archive maintenance runs
+ARCHIVE_LOCK_ID = 0x6172_6368
+
+
+def add_months(month: datetime.datetime, months: int) -> datetime.datetime:
+    """First day of month [months] away from [month]"""
+    idx = month.year * 12 + month.month - 1 + months
+    return month.replace(year=idx // 12, month=idx % 12 + 1, day=1)
+
+
+class ArchivePartition(NamedTuple):
+    """Monthly `games_archive` partition, by `finished_at`"""
+
+    name: str
+    start: datetime.datetime
+    end: datetime.datetime
+
+    @classmethod
+    def of_month(cls, month: datetime.datetime) -> "ArchivePartition":
+        start = month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        return cls(
+            name=f"{ARCHIVE_PARTITION_PREFIX}{start:%Y%m}",
+            start=start,
+            end=add_months(start, 1),
+        )
+
+    @classmethod
+    def of_name(cls, name: str) -> Optional["ArchivePartition"]:
+        suffix = name[len(ARCHIVE_PARTITION_PREFIX):]
+        if not name.startswith(ARCHIVE_PARTITION_PREFIX) or not suffix.isdigit():
+            return None
+        return cls.of_month(
+            datetime.datetime(
+                int(suffix[:4]), int(suffix[4:]), 1, tzinfo=datetime.timezone.utc
+            )
+        )
+
+
+async def get_archive_partitions(connection: AsyncConnection[Any]) -> List[str]:
+    """Get `games_archive` partition names, including default one"""
+    async with connection.cursor() as cursor:
+        await cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = 'games_archive'::regclass
+            """
+        )
+        return [row[0] for row in await cursor.fetchall()]
+
+
+async def compact_archive(
+    connection: AsyncConnection[Any],
+    retention_months: int,
+    months_ahead: int = 1,
+    now: Optional[datetime.datetime] = None,
+) -> ArchiveCompaction:
+    """Maintain monthly `games_archive` partitions, each change in own transaction
+
+    Creates partitions for upcoming months and for rows landed in default
+    partition, moving those rows into them. Drops partitions older than
+    [retention_months].
+
+    Args:
+        connection (AsyncConnection): Database connection
+        retention_months (int): Months of history to keep, besides current one
+        months_ahead (int, optional): Upcoming months partitions. Defaults to 1.
+        now (Optional[datetime.datetime], optional): Current time. Defaults to UTC now.
+
+    Returns:
+        ArchiveCompaction: Applied changes
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    current = ArchivePartition.of_month(now)
+    retention_start = add_months(current.start, -retention_months)
+    result = ArchiveCompaction()
+
+    existing = set(await get_archive_partitions(connection))
+    async with connection.cursor() as cursor:
+        await cursor.execute(
+            """
+            SELECT DISTINCT date_trunc('month', to_timestamp(finished_at) AT TIME ZONE 'UTC')
+            FROM games_archive_default
+            WHERE finished_at >= %s
+            """,
+            (int(retention_start.timestamp()),),
+        )
+        months = {
+            month.replace(tzinfo=datetime.timezone.utc)
+            for (month,) in await cursor.fetchall()
+        }
+    await connection.commit()
+    months.update(add_months(current.start, i) for i in range(months_ahead + 1))
+
+    for month in sorted(months):
+        partition = ArchivePartition.of_month(month)
+        if partition.name in existing:
+            continue
+        async with connection.transaction():
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT pg_advisory_xact_lock(%s)", (ARCHIVE_LOCK_ID,))
+                result.moved += await _create_partition(cursor, partition)
+        result.created.append(partition.name)
+
+    for name in sorted(existing):
+        partition = ArchivePartition.of_name(name)
+        if partition is None or partition.end > retention_start:
+            continue
+        async with connection.transaction():
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT pg_advisory_xact_lock(%s)", (ARCHIVE_LOCK_ID,))
+                await cursor.execute(
+                    sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(name))
+                )
+        result.dropped.append(name)
+
+    async with connection.transaction():
+        async with connection.cursor() as cursor:
+            await cursor.execute(
+                "DELETE FROM games_archive_default WHERE finished_at < %s",
+                (int(retention_start.timestamp()),),
+            )
+            result.deleted = cursor.rowcount
+
+    return result
+
+
+async def _create_partition(
+    cursor: AsyncCursor[Any], partition: ArchivePartition
+) -> int:
+    """Create and attach monthly partition, moving its rows out of default partition
+
+    Returns:
+        int: Moved rows
+    """
+    name = sql.Identifier(partition.name)
+    start = sql.Literal(int(partition.start.timestamp()))
+    end = sql.Literal(int(partition.end.timestamp()))
+
+    await cursor.execute(
+        sql.SQL(
+            "CREATE TABLE {} (LIKE games_archive INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ).format(name)
+    )
+    await cursor.execute(
+        sql.SQL(
+            """
+            WITH moved AS (
+                DELETE FROM games_archive_default
+                WHERE finished_at >= {start} AND finished_at < {end}
+                RETURNING id, game_id, group_id, message_id,
+                owner_id, owner_name, word, created_at, finished_at
+            )
+            INSERT INTO {name} (id, game_id, group_id, message_id,
+            owner_id, owner_name, word, created_at, finished_at)
+            SELECT * FROM moved
+            """
+        ).format(name=name, start=start, end=end)
+    )
+    moved: int = cursor.rowcount
+    await cursor.execute(
+        sql.SQL(
+            "ALTER TABLE games_archive ATTACH PARTITION {} FOR VALUES FROM ({}) TO ({})"
+        ).format(name, start, end)
+    )
+    return moved
@@ -0,0 +1,199 @@
+import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+from psycopg import AsyncConnection
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    sql: str
+
+
+MIGRATIONS: Sequence[Migration] = (
+    Migration(
+        version=1,
+        description="Create users and games tables",
+        sql="""
+        CREATE TABLE IF NOT EXISTS users(
+            id serial primary key not null,
+            telegram_id bigint not null unique,
+            created_at bigint not null,
+            banned boolean not null default false,
+            available_for_broadcast boolean not null default true
+        );
+
+        CREATE TABLE IF NOT EXISTS games(
+            id serial primary key not null,
+            game_id varchar(128) not null,
+            group_id bigint not null,
+            message_id bigint not null default 0,
+            owner_id bigint not null,
+            owner_name varchar(128) not null,
+            word varchar(128) not null,
+            created_at bigint not null,
+            finished boolean not null default false
+        );
+        """,
+    ),
+    Migration(
+        version=2,
+        description="Index games lookups, allow one active game per group",
+        sql="""
+        UPDATE games
+        SET finished = TRUE
+        WHERE games.finished IS NOT TRUE
+        AND EXISTS (
+            SELECT 1 FROM games AS newer
+            WHERE newer.group_id = games.group_id
+            AND newer.finished IS NOT TRUE
+            AND newer.id > games.id
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS games_game_id_key
+        ON games (game_id);
+
+        CREATE UNIQUE INDEX IF NOT EXISTS games_active_group_id_key
+        ON games (group_id) WHERE finished IS NOT TRUE;
+
+        CREATE INDEX IF NOT EXISTS games_group_id_idx
+        ON games (group_id);
+        """,
+    ),
+    Migration(
+        version=3,
+        description="Create word_decks table",
+        sql="""
+        CREATE TABLE IF NOT EXISTS word_decks(
+            group_id bigint not null,
+            locale varchar(16) not null,
+            seed bigint not null,
+            position integer not null,
+            size integer not null,
+            primary key (group_id, locale)
+        );
+        """,
+    ),
+    Migration(
+        version=4,
+        description="Create games_archive table partitioned by finish month",
+        sql="""
+        CREATE TABLE IF NOT EXISTS games_archive(
+            id integer not null,
+            game_id varchar(128) not null,
+            group_id bigint not null,
+            message_id bigint not null,
+            owner_id bigint not null,
+            owner_name varchar(128) not null,
+            word varchar(128) not null,
+            created_at bigint not null,
+            finished_at bigint not null
+        ) PARTITION BY RANGE (finished_at);
+
+        CREATE TABLE IF NOT EXISTS games_archive_default
+        PARTITION OF games_archive DEFAULT;
+
+        CREATE INDEX IF NOT EXISTS games_archive_group_id_idx
+        ON games_archive (group_id);
+
+        WITH finished AS (
+            DELETE FROM games
+            WHERE games.finished IS TRUE
+            RETURNING id, game_id, group_id, message_id,
+            owner_id, owner_name, word, created_at
+        )
+        INSERT INTO games_archive (id, game_id, group_id, message_id,
+        owner_id, owner_name, word, created_at, finished_at)
+        SELECT id, game_id, group_id, message_id,
+        owner_id, owner_name, word, created_at, created_at
+        FROM finished;
+        """,
+    ),
+)
+
+# Arbitrary key: serializes concurrent migration runs
+MIGRATIONS_LOCK_ID = 0x6472_6177
+
+
+async def get_schema_version(connection: AsyncConnection[Any]) -> int:
+    """Get applied schema version
+
+    Args:
+        connection (AsyncConnection): Database connection
+
+    Returns:
+        int: Latest applied migration version, 0 if none
+    """
+    async with connection.cursor() as cursor:
+        await cursor.execute("SELECT to_regclass('schema_version')")
+        if (await cursor.fetchone())[0] is None:
+            return 0
+
+        await cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return (await cursor.fetchone())[0]
+
+
+async def migrate(
+    connection: AsyncConnection[Any],
+    migrations: Sequence[Migration] = MIGRATIONS,
+    target_version: Optional[int] = None,
+) -> int:
+    """Apply pending migrations in version order, each in own transaction
+
+    Args:
+        connection (AsyncConnection): Database connection
+        migrations (Sequence[Migration], optional): Known migrations. Defaults to MIGRATIONS.
+        target_version (Optional[int], optional): Stop after this version. Defaults to latest.
+
+    Returns:
+        int: Applied schema version
+    """
+    async with connection.transaction():
+        async with connection.cursor() as cursor:
+            await cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATIONS_LOCK_ID,))
+            await cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version(
+                    version integer primary key not null,
+                    description varchar(256) not null,
+                    applied_at bigint not null
+                );
+                """
+            )
+        version = await get_schema_version(connection)
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= version:
+            continue
+        if target_version is not None and migration.version > target_version:
+            break
+
+        async with connection.transaction():
+            async with connection.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", (MIGRATIONS_LOCK_ID,)
+                )
+                await cursor.execute(
+                    "SELECT 1 FROM schema_version WHERE version = %s",
+                    (migration.version,),
+                )
+                if await cursor.fetchone():
+                    # Applied concurrently by another process
+                    version = migration.version
+                    continue
+
+                await cursor.execute(migration.sql)
+                await cursor.execute(
+                    """
+                    INSERT INTO schema_version (version, description, applied_at)
+                    VALUES (%s, %s, %s)
+                    """,
+                    (
+                        migration.version,
+                        migration.description,
+                        int(datetime.datetime.now(datetime.timezone.utc).timestamp()),
+                    ),
+                )
+        version = migration.version
+
+    return version
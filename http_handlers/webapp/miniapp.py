@@ -1,18 +1,27 @@
 import asyncio
 from pathlib import Path
-from typing import Union
+from typing import Callable, Hashable, NamedTuple, Optional
 
 import aiohttp_jinja2
 import jinja2
-from aiohttp import web
+from aiohttp import BodyPartReader, web
 from aiohttp_sse import EventSourceResponse, sse_response
 from aiohttplimiter import Limiter, default_keyfunc
 
-from services.gamecontroller import (GameController, GameEvent, GameEventType,
-                                     GameWordStatus)
+from logger import logger
+from services.gamecontroller import (GameController, GameEventType,
+                                     GameWordStatus, SessionEvent,
+                                     StrokesStatus)
 
 limiter = Limiter(keyfunc=default_keyfunc)
 
+# Canvas image upload size limit
+MAX_IMAGE_BYTES = 2 * 1024 * 1024
+# `_auth` and `gameId` upload fields size limit
+MAX_FIELD_BYTES = 8 * 1024
+# Time given to open SSE connections to close on shutdown
+SHUTDOWN_DRAIN_TIMEOUT_SEC = 5
+
 
 @limiter.limit("1/second")
 async def miniapp_handler(request: web.Request) -> web.Response:
@@ -21,26 +30,107 @@ async def miniapp_handler(request: web.Request) -> web.Response:
     )
 
 
+async def read_part(part: BodyPartReader, limit: int) -> Optional[bytearray]:
+    """Read multipart [part] body chunk by chunk, `None` when it exceeds [limit] bytes"""
+    data = bytearray()
+    while chunk := await part.read_chunk():
+        if len(data) + len(chunk) > limit:
+            return None
+        data.extend(chunk)
+    return data
+
+
 @limiter.limit("1/second")
 async def update_canvas_handler(request: web.Request) -> web.Response:
+    """Streamed multipart upload: `_auth` and `gameId` fields must precede `image`,
+    so the host is checked before any image byte is read"""
     if request.content_type != "multipart/form-data":
         return web.Response(status=401, text="Incorrect content type")
 
-    params = await request.post()
+    if (
+        request.content_length is not None
+        and request.content_length > MAX_IMAGE_BYTES + 2 * MAX_FIELD_BYTES
+    ):
+        return web.Response(status=413, text="Image is too large")
+
+    controller: GameController = request.app["controller"]
+    fields: dict[str, str] = {}
+
+    reader = await request.multipart()
+    while (part := await reader.next()) is not None:
+        if not isinstance(part, BodyPartReader):
+            return web.Response(status=401, text="Incorrect content type")
+
+        if part.name in ("_auth", "gameId"):
+            value = await read_part(part, MAX_FIELD_BYTES)
+            if value is None:
+                return web.Response(status=413, text="Field is too large")
+            fields[part.name] = value.decode(part.get_charset("utf-8"))
+        elif part.name == "image":
+            if "_auth" not in fields or "gameId" not in fields:
+                return web.Response(status=401, text="Some keys are missing")
+
+            if not await controller.is_host(
+                init_data=fields["_auth"], game_id=fields["gameId"]
+            ):
+                return web.Response(text="error", status=401)
+
+            # Image can't be forwarded thru event bus to game canvas publisher
+            if not controller.is_canvas_publisher(game_id=fields["gameId"]):
+                return web.Response(status=421, text="Misdirected request")
+
+            data = await read_part(part, MAX_IMAGE_BYTES)
+            if data is None:
+                return web.Response(status=413, text="Image is too large")
+
+            return (
+                web.Response(text="OK")
+                if await controller.update_state(
+                    init_data=fields["_auth"],
+                    game_id=fields["gameId"],
+                    data=data,
+                    filename=part.filename or "canvas",
+                )
+                else web.Response(text="error", status=401)
+            )
+        else:
+            await part.release()
+
+    return web.Response(status=401, text="Some keys are missing")
 
-    if "_auth" not in params or "image" not in params or "gameId" not in params:
+
+@limiter.limit("3/second")
+async def update_strokes_handler(request: web.Request) -> web.Response:
+    if request.content_type != "application/json":
+        return web.Response(status=401, text="Incorrect content type")
+
+    try:
+        params = await request.json()
+        width, height = int(params["width"]), int(params["height"])
+        init_data, game_id, strokes = params["_auth"], params["gameId"], params["strokes"]
+    except (ValueError, TypeError, KeyError):
         return web.Response(status=401, text="Some keys are missing")
 
-    controller: GameController = request.app["controller"]
+    if not isinstance(init_data, str) or not isinstance(game_id, str):
+        return web.Response(status=401, text="Some keys are missing")
 
-    return (
-        web.Response(text="OK")
-        if await controller.update_state(
-            init_data=params["_auth"], game_id=params["gameId"], image=params["image"]
-        )
-        else web.Response(text="error", status=401)
+    controller: GameController = request.app["controller"]
+    status = await controller.update_strokes(
+        init_data=init_data,
+        game_id=game_id,
+        strokes=strokes,
+        width=width,
+        height=height,
     )
 
+    match status:
+        case StrokesStatus.Ok:
+            return web.Response(text="OK")
+        case StrokesStatus.Unavailable:
+            return web.Response(text=status, status=503)
+        case _:
+            return web.Response(text="error", status=401)
+
 
 @limiter.limit("1/second")
 async def get_word_handler(request: web.Request) -> web.Response:
@@ -88,6 +178,68 @@ class EventSourceResponsePatched(EventSourceResponse):
         return self.prepared and not self._ping_task.done()
 
 
+class _Connection(NamedTuple):
+    ping_task: asyncio.Task
+    on_ping_done: Callable[[asyncio.Task], None]
+    stop: Callable[[], None]
+
+
+class EventConnections:
+    def __init__(self) -> None:
+        """Open SSE connections of this process"""
+        self.__connections: dict[Hashable, _Connection] = {}
+        self.__drained = asyncio.Event()
+        self.__drained.set()
+        self.__closing = False
+
+    def __len__(self) -> int:
+        return len(self.__connections)
+
+    def open(
+        self, key: Hashable, resp: EventSourceResponse, stop: Callable[[], None]
+    ) -> bool:
+        """Register connection, `False` when shutting down
+
+        [stop] is called when response ping task is done, i.e. client disconnected.
+        Ping task is watched thru done callback: `EventSourceResponse.wait()`
+        suppresses cancellation, so a task awaiting it can't be cancelled.
+
+        Args:
+            key (Hashable): Connection events queue, unique per connection
+            resp (EventSourceResponse): Prepared SSE response
+            stop (Callable[[], None]): Wakes connection handler up to finish
+        """
+        ping_task = resp._ping_task
+        if self.__closing or ping_task is None:
+            return False
+
+        def on_ping_done(_: asyncio.Task) -> None:
+            stop()
+
+        ping_task.add_done_callback(on_ping_done)
+        self.__connections[key] = _Connection(ping_task, on_ping_done, stop)
+        self.__drained.clear()
+        return True
+
+    def close(self, key: Hashable) -> None:
+        """Unregister connection and stop watching its ping task"""
+        connection = self.__connections.pop(key, None)
+        if connection:
+            connection.ping_task.remove_done_callback(connection.on_ping_done)
+        if not self.__connections:
+            self.__drained.set()
+
+    async def drain(self, timeout: float) -> None:
+        """Disconnect all connections and wait for their handlers to finish"""
+        self.__closing = True
+        for connection in list(self.__connections.values()):
+            connection.stop()
+        try:
+            await asyncio.wait_for(self.__drained.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{len(self)} SSE connections are still open on shutdown")
+
+
 @limiter.limit("1/second")
 async def game_events_handler(request: web.Request) -> web.Response:
     params = request.rel_url.query
@@ -96,6 +248,7 @@ async def game_events_handler(request: web.Request) -> web.Response:
         return web.Response(status=204)
 
     controller: GameController = request.app["controller"]
+    connections: EventConnections = request.app["connections"]
     _auth = params["_auth"]
     game_id = params["gameId"]
 
@@ -105,17 +258,15 @@ async def game_events_handler(request: web.Request) -> web.Response:
     async with sse_response(request, response_cls=EventSourceResponsePatched) as resp:
         resp.ping_interval = 5
 
-        async def stop_event_on_disconnect() -> None:
-            await resp.wait()
-            await queue.put(GameEventType.Disconnect)
+        def stop() -> None:
+            queue.put_nowait(GameEventType.Disconnect)
 
-        asyncio.create_task(stop_event_on_disconnect())
+        if not connections.open(queue, resp, stop):
+            stop()
 
         try:
             while resp.is_connected():
-                event: Union[GameEvent, GameEventType]
-                event = await queue.get()
-                queue.task_done()
+                event: SessionEvent = await queue.get()
 
                 if event == GameEventType.Disconnect:
                     break
@@ -128,6 +279,7 @@ async def game_events_handler(request: web.Request) -> web.Response:
         except ConnectionResetError:
             pass
         finally:
+            connections.close(queue)
             await controller.unsub(
                 game_id=game_id,
                 session_queue=queue
@@ -136,6 +288,50 @@ async def game_events_handler(request: web.Request) -> web.Response:
     return resp
 
 
+@limiter.limit("1/second")
+async def spectator_events_handler(request: web.Request) -> web.Response:
+    """Read-only game strokes for non-host group members"""
+    params = request.rel_url.query
+
+    if "_auth" not in params or "gameId" not in params:
+        return web.Response(status=204)
+
+    controller: GameController = request.app["controller"]
+    connections: EventConnections = request.app["connections"]
+    game_id = params["gameId"]
+
+    subscriber = await controller.watch(init_data=params["_auth"], game_id=game_id)
+
+    resp: EventSourceResponsePatched
+    async with sse_response(request, response_cls=EventSourceResponsePatched) as resp:
+        resp.ping_interval = 5
+
+        if not connections.open(subscriber, resp, subscriber.close):
+            subscriber.close()
+
+        try:
+            while resp.is_connected():
+                frame = await subscriber.get()
+                if frame is None:
+                    break
+                # Dropped frames are replaced by current snapshot
+                if subscriber.resync():
+                    frame = controller.spectator_snapshot(game_id) or frame
+                # Frames are encoded once for all spectators
+                await resp.write(frame)
+        except ConnectionResetError:
+            pass
+        finally:
+            connections.close(subscriber)
+            controller.unwatch(game_id=game_id, subscriber=subscriber)
+
+    return resp
+
+
+async def drain_connections(app: web.Application) -> None:
+    await app["connections"].drain(timeout=SHUTDOWN_DRAIN_TIMEOUT_SEC)
+
+
 app = web.Application()
 aiohttp_jinja2.setup(
     app,
@@ -147,11 +343,15 @@ app.add_routes(
     [
         web.get("", miniapp_handler),
         web.post("/update", update_canvas_handler),
+        web.post("/strokes", update_strokes_handler),
         web.get("/word", get_word_handler),
         web.get("/events", game_events_handler),
+        web.get("/watch", spectator_events_handler),
         web.static(
             "/static", Path(__file__).parent.resolve() / "static", name="static"
         ),
     ]
 )
 app["static_root_url"] = "/web/app/static"
+app["connections"] = EventConnections()
+app.on_shutdown.append(drain_connections)
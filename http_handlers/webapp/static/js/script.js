@@ -11,6 +11,7 @@
             "ended": "Game ended",
             "not_auth": "No authorization",
             "already_connected": "The host is already connected",
+            "too_many_spectators": "Too many spectators",
             "error": "Error"
         },
         "ru": {
@@ -20,6 +21,7 @@
             "ended": "Игра закончилась",
             "not_auth": "Нет авторизации",
             "already_connected": "Ведущий уже подключен",
+            "too_many_spectators": "Слишком много зрителей",
             "error": "Ошибка"
         },
     };
@@ -63,12 +65,13 @@
         clearBtn = document.getElementById('clear'),
         wordBtn = document.getElementById('word'),
 
-        publishImagePadding = 18;
+        // Keep in sync with MAX_BATCH_POINTS and MAX_BATCH_OPS on server
+        strokesBatchPoints = 512,
+        strokesBatchOps = 64;
 
     let drawingWord = null,
         rawBrushData = [],
         drawing = false,
-        dirty = false,
         paintSize = 3,
         color = '#000000',
         prevColor = null,
@@ -76,13 +79,18 @@
         eraserColor = '#ffffff',
         currentTool = 'painter',
         selectedBtn = null,
-        drawingBoundary = null;
+        pendingStrokes = [],
+        strokesInFlight = false,
+        // Spectator mode: host strokes since last clear and host canvas size
+        spectatorStrokes = [],
+        sourceWidth = 0,
+        sourceHeight = 0;
 
     onDrawToolSelected('painter', smallDotBtn, 3);
     attachCanvasListeners();
 
     let eventSource = subscribeToGameEvents();
-    let intervalHandle = setInterval(() => publishImage(), 1_500);
+    let strokesIntervalHandle = setInterval(() => publishStrokes(), 500);
 
     function attachCanvasListeners() {
         // Try to not fire slide down event:
@@ -140,7 +148,6 @@
         rawBrushData.push({ x: e.clientX, y: e.clientY });
 
         drawing = true;
-        dirty = true;
 
         ctx.beginPath();
         ctx.arc(e.clientX, e.clientY, paintSize / 2, 0, Math.PI * 2);
@@ -198,14 +205,11 @@
     function finalizeDrawing() {
         if (!rawBrushData) return;
 
-        if (!drawingBoundary) drawingBoundary = { x1: window.innerWidth, y1: window.innerHeight, x2: 0, y2: 0 }
-
-        for (point in rawBrushData) {
-            drawingBoundary.x2 = Math.max(drawingBoundary.x2, rawBrushData[point].x);
-            drawingBoundary.y2 = Math.max(drawingBoundary.y2, rawBrushData[point].y);
-            drawingBoundary.x1 = Math.min(drawingBoundary.x1, rawBrushData[point].x);
-            drawingBoundary.y1 = Math.min(drawingBoundary.y1, rawBrushData[point].y);
-        }
+        pendingStrokes.push({
+            c: color,
+            s: paintSize,
+            p: rawBrushData.flatMap((point) => [Math.round(point.x), Math.round(point.y)])
+        });
 
         finalizePath = (currentTool === 'painter')
 
@@ -281,13 +285,14 @@
         vcanvas.width = window.innerWidth;
         canvas.height = window.innerHeight;
         vcanvas.height = window.innerHeight;
-        drawingBoundary = null;
+        // Resizing clears canvas
+        pendingStrokes.push({ clear: true });
     }
 
     function clearCanvas() {
         ctx.clearRect(0, 0, canvas.width, canvas.height);
         vctx.clearRect(0, 0, vcanvas.width, vcanvas.height);
-        drawingBoundary = null;
+        pendingStrokes.push({ clear: true });
     }
 
     function subscribeToGameEvents() {
@@ -301,12 +306,107 @@
             showWord();
         });
         gameEventsListener.addEventListener('error', (event) => {
+            if (event.data === 'not_host') {
+                startSpectating();
+                return;
+            }
             showFullBlockingMessage(_(event.data))
             clearAll();
         });
         return gameEventsListener;
     }
 
+    function startSpectating() {
+        clearAll();
+        pendingStrokes = [];
+        document.getElementById('buttonbar').style.display = 'none';
+        window.addEventListener('resize', onSpectatorResize, false);
+        onSpectatorResize();
+
+        let url = new URL("/web/app/watch", window.location.href);
+        url.searchParams.set('_auth', initData);
+        url.searchParams.set('gameId', gameId);
+
+        eventSource = new EventSource(url);
+        eventSource.addEventListener('snapshot', (event) => {
+            spectatorStrokes = [];
+            applyStrokes(JSON.parse(event.data), true);
+        });
+        eventSource.addEventListener('strokes', (event) => {
+            applyStrokes(JSON.parse(event.data), false);
+        });
+        eventSource.addEventListener('error', (event) => {
+            // Connection errors have no data, EventSource reconnects itself
+            if (!event.data) return;
+            showFullBlockingMessage(_(event.data));
+            window.removeEventListener('resize', onSpectatorResize, false);
+            eventSource.close();
+        });
+    }
+
+    function onSpectatorResize() {
+        canvas.width = window.innerWidth;
+        canvas.height = window.innerHeight;
+        redrawStrokes();
+    }
+
+    function applyStrokes(batch, redraw) {
+        if (batch.width !== sourceWidth || batch.height !== sourceHeight) {
+            sourceWidth = batch.width;
+            sourceHeight = batch.height;
+            redraw = true;
+        }
+
+        let fresh = [];
+        for (const op of batch.strokes) {
+            if (op.clear) {
+                spectatorStrokes = [];
+                fresh = [];
+                redraw = true;
+                continue;
+            }
+            spectatorStrokes.push(op);
+            fresh.push(op);
+        }
+
+        if (redraw) {
+            redrawStrokes();
+        } else {
+            fresh.forEach(drawStroke);
+        }
+    }
+
+    function redrawStrokes() {
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        spectatorStrokes.forEach(drawStroke);
+    }
+
+    function drawStroke(op) {
+        // Host canvas is fit into spectator canvas
+        const scale = Math.min(canvas.width / sourceWidth, canvas.height / sourceHeight) || 1;
+
+        ctx.save();
+        ctx.scale(scale, scale);
+        ctx.strokeStyle = op.c;
+        ctx.fillStyle = op.c;
+        ctx.lineWidth = op.s;
+        ctx.lineCap = 'round';
+        ctx.lineJoin = 'round';
+
+        ctx.beginPath();
+        if (op.p.length === 2) {
+            ctx.arc(op.p[0], op.p[1], op.s / 2, 0, Math.PI * 2);
+            ctx.fill();
+        } else {
+            ctx.moveTo(op.p[0], op.p[1]);
+            for (let i = 2; i < op.p.length; i += 2) {
+                ctx.lineTo(op.p[i], op.p[i + 1]);
+            }
+            ctx.stroke();
+        }
+        ctx.restore();
+    }
+
     function showWord() {
         if (drawingWord) {
             Telegram.WebApp.showPopup({ title: _('word'), message: drawingWord });
@@ -332,39 +432,60 @@
         XHR.send();
     }
 
-    function publishImage() {
-        if (drawing || !dirty || drawingBoundary == null) return;
-
-        dirty = false;
-
-        bounded_vcanvas = document.createElement('canvas');
+    function takeStrokesBatch() {
+        let batch = [],
+            points = 0;
 
-        const boundWidth = drawingBoundary.x2 - drawingBoundary.x1 + publishImagePadding * 2,
-            boundHeight = drawingBoundary.y2 - drawingBoundary.y1 + publishImagePadding * 2;
+        while (pendingStrokes.length > 0 && batch.length < strokesBatchOps) {
+            const op = pendingStrokes[0];
+            if (op.clear) {
+                batch.push(pendingStrokes.shift());
+                continue;
+            }
 
-        bounded_vcanvas.width = boundWidth;
-        bounded_vcanvas.height = boundHeight;
+            const free = strokesBatchPoints - points,
+                opPoints = op.p.length / 2;
+            if (opPoints <= free) {
+                batch.push(pendingStrokes.shift());
+                points += opPoints;
+                continue;
+            }
+            if (free >= 2) {
+                // Split long stroke, tail continues from the last sent point
+                batch.push({ c: op.c, s: op.s, p: op.p.slice(0, free * 2) });
+                op.p = op.p.slice((free - 1) * 2);
+            }
+            break;
+        }
 
-        bounded_vctx = bounded_vcanvas.getContext('2d');
-        bounded_vctx.drawImage(
-            vcanvas,
-            drawingBoundary.x1 - publishImagePadding, drawingBoundary.y1 - publishImagePadding,
-            boundWidth, boundHeight,
-            0, 0,
-            boundWidth, boundHeight
-        );
+        return batch;
+    }
 
-        bounded_vcanvas.toBlob((blob) => {
-            let formData = new FormData();
-            formData.append('_auth', initData)
-            formData.append('image', blob, 'image.webp')
-            formData.append('gameId', gameId)
+    function publishStrokes() {
+        if (strokesInFlight || pendingStrokes.length === 0) return;
 
-            let XHR = new XMLHttpRequest();
-            XHR.open('POST', '/web/app/update');
-            XHR.send(formData);
+        strokesInFlight = true;
 
-        }, 'image/webp', 0.1);
+        const batch = takeStrokesBatch();
+        let XHR = new XMLHttpRequest();
+        XHR.addEventListener('loadend', event => {
+            const status = event.target.status;
+            // Rate limited, server or network failure: batch is sent again on next tick.
+            // 401 - game is over or batch is rejected
+            if ((status < 200 || status >= 300) && status !== 401) {
+                pendingStrokes.unshift(...batch);
+            }
+            strokesInFlight = false;
+        });
+        XHR.open('POST', '/web/app/strokes');
+        XHR.setRequestHeader('Content-Type', 'application/json');
+        XHR.send(JSON.stringify({
+            _auth: initData,
+            gameId: gameId,
+            width: canvas.width,
+            height: canvas.height,
+            strokes: batch
+        }));
     }
 
     function showFullBlockingMessage(message) {
@@ -375,7 +496,7 @@
 
     function clearAll() {
         detachListeners();
-        clearInterval(intervalHandle);
+        clearInterval(strokesIntervalHandle);
         eventSource.close();
     }
 })();
\ No newline at end of file
@@ -1,4 +1,7 @@
 import asyncio
+import socket
+import sys
+from typing import Optional
 
 from aiogram import Bot, Dispatcher, types
 from aiogram.fsm.storage.memory import MemoryStorage
@@ -10,14 +13,22 @@ from aiogram.webhook.security import IPFilter
 from aiohttp import web
 
 import http_handlers
+from common.prefork import reuse_port_socket, run_workers
 from config import config
 from database.postgres import Database, PsycopgDatabase
 from handlers import game, invite, start
 from logger import setup_logger
 from middlewares import (ignore_channels, register_error_handler,
                          register_i18n, register_throttle)
+from services.archivemaintenance import ArchiveMaintenance
+from services.broadcast import BroadcastHub
+from services.eventbus import EventBus, InProcessEventBus, PostgresEventBus
 from services.gamecontroller import GameController
-from services.wordprovider import FileWordProvider, FileWords
+from services.imagepipeline import ImagePipeline
+from services.outbound import OutboundScheduler
+from services.rasterizer import CanvasRenderer
+from services.wordprovider import (FileWordProvider, FileWords,
+                                   ShuffledDeckWordProvider)
 
 i18n = I18n(path="locales", default_locale="en", domain="messages")
 
@@ -73,8 +84,19 @@ async def set_bot_commands(bot: Bot) -> None:
     await asyncio.gather(private_commands, group_commands)
 
 
-async def on_startup(dispatcher: Dispatcher, bot: Bot, db: Database) -> None:
+async def on_startup(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    db: Database,
+    controller: GameController,
+    archive_maintenance: ArchiveMaintenance,
+    primary_worker: bool,
+) -> None:
     await db.open()
+    await controller.start(reap_stale_games=primary_worker)
+    if not primary_worker:
+        return
+    archive_maintenance.start()
     await asyncio.gather(
         bot.set_webhook(
             f"{config.host}/bot/{config.webhook_endpoint_secret.get_secret_value()}",
@@ -85,19 +107,45 @@ async def on_startup(dispatcher: Dispatcher, bot: Bot, db: Database) -> None:
     )
 
 
-async def on_shutdown(db: Database) -> None:
+async def on_shutdown(
+    db: Database, controller: GameController, archive_maintenance: ArchiveMaintenance
+) -> None:
+    await archive_maintenance.close()
+    await controller.close()
     try:
         await db.close()
     except Exception:
         pass
 
 
-def start_app() -> None:
+def start_app(
+    worker_idx: int = 0, workers: int = 1, sock: Optional[socket.socket] = None
+) -> None:
     dispatcher = Dispatcher(storage=MemoryStorage())
     dispatcher.include_routers(start.router, game.router, invite.router)
-
-    database = PsycopgDatabase(config.db_url.get_secret_value())
+    # Only primary worker sets up webhook and commands
+    dispatcher["primary_worker"] = worker_idx == 0
+
+    database = PsycopgDatabase(
+        config.db_url.get_secret_value(),
+        min_conn=config.db_pool_min_size,
+        max_conn=config.db_pool_max_size,
+        pool_timeout_sec=config.db_pool_timeout_sec,
+        pool_max_idle_sec=config.db_pool_max_idle_sec,
+        health_check_interval_sec=config.db_pool_check_interval_sec,
+    )
     dispatcher["db"] = database
+    dispatcher["archive_maintenance"] = ArchiveMaintenance(
+        db=database,
+        retention_months=config.games_archive_retention_months,
+        interval_sec=config.games_archive_compaction_interval_sec,
+    )
+
+    event_bus: EventBus = (
+        PostgresEventBus(db=database, connection_string=config.db_url.get_secret_value())
+        if config.event_bus == "postgres" or config.workers > 1
+        else InProcessEventBus()
+    )
 
     register_middlewares(dispatcher)
 
@@ -110,11 +158,41 @@ def start_app() -> None:
         bot=bot,
         db=database,
         i18n=i18n,
-        word_provider=FileWordProvider(
-            FileWords(
-                locale="en", filepath="./resources/words/en.txt", lines=1524),
+        word_provider=ShuffledDeckWordProvider(
+            FileWordProvider(
+                FileWords(locale="en", filepath="./resources/words/en.txt"),
+            ),
+            db=database,
         ),
         initial_canvas_file_id=config.initial_canvas_file_id,
+        canvas_update_interval_sec=config.canvas_update_interval_sec,
+        event_bus=event_bus,
+        canvas_renderer=CanvasRenderer(
+            output_side=config.canvas_image_side,
+            image_format=config.canvas_image_format,
+            quality=config.canvas_image_quality,
+        ),
+        image_pipeline=ImagePipeline(
+            max_side=config.canvas_image_side,
+            max_bytes=config.canvas_image_max_bytes,
+            image_format=config.canvas_image_format,
+            quality=config.canvas_image_quality,
+            workers=config.image_pipeline_workers,
+        ),
+        # Bot global budget is shared by workers, per chat budgets are per worker
+        outbound=OutboundScheduler(
+            global_rate=config.telegram_global_rate_per_sec / workers,
+            chat_rate=config.telegram_group_rate_per_min / 60,
+        ),
+        broadcast=BroadcastHub(
+            max_subscribers=config.spectators_per_game_limit,
+            queue_size=config.spectator_queue_size,
+        ),
+        stale_game_ttl_sec=config.stale_game_ttl_sec,
+        stale_game_sweep_interval_sec=config.stale_game_sweep_interval_sec,
+        stale_game_sweep_limit=config.stale_game_sweep_limit,
+        worker_idx=worker_idx,
+        workers=workers,
     )
     http_handlers.provide_gamecontroller(game_controller)
     dispatcher["controller"] = game_controller
@@ -135,14 +213,13 @@ def start_app() -> None:
     app.add_subapp("/bot", bot_app)
     app.add_subapp("/web", http_handlers.app)
 
-    web.run_app(app, host="0.0.0.0", port=config.port)
-
-
-if __name__ == "__main__":
-    setup_logger()
+    if sock:
+        web.run_app(app, sock=sock)
+    else:
+        web.run_app(app, host="0.0.0.0", port=config.port)
 
-    import sys
 
+def setup_event_loop() -> None:
     if sys.platform == "win32":
         # required by psycopg async pool
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -151,4 +228,23 @@ if __name__ == "__main__":
 
         uvloop.install()
 
-    start_app()
+
+def run_worker(worker_idx: int) -> None:
+    """Worker process entrypoint, serves on shared port"""
+    setup_logger()
+    setup_event_loop()
+    start_app(
+        worker_idx=worker_idx,
+        workers=config.workers,
+        sock=reuse_port_socket("0.0.0.0", config.port),
+    )
+
+
+if __name__ == "__main__":
+    setup_logger()
+
+    if config.workers > 1 and hasattr(socket, "SO_REUSEPORT"):
+        run_workers(run_worker, workers=config.workers)
+    else:
+        setup_event_loop()
+        start_app()
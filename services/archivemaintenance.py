@@ -0,0 +1,47 @@
+import asyncio
+from typing import Optional
+
+from database import Database
+from logger import logger
+
+
+class ArchiveMaintenance:
+    def __init__(
+        self, db: Database, retention_months: int = 12, interval_sec: float = 3600
+    ) -> None:
+        """Background games archive compaction and retention,
+        meant to run in a single (primary) process
+
+        Args:
+            db (Database): Database instance
+            retention_months (int, optional): Months of history to keep. Defaults to 12.
+            interval_sec (float, optional): Runs interval. Defaults to 3600.
+        """
+        self.__db = db
+        self.__retention_months = retention_months
+        self.__interval_sec = interval_sec
+        self.__task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start periodic runs, first one right away"""
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def close(self) -> None:
+        """Stop periodic runs"""
+        if self.__task:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                result = await self.__db.compact_games_archive(
+                    retention_months=self.__retention_months
+                )
+                if result.created or result.dropped or result.moved or result.deleted:
+                    logger.info(f"Games archive compacted: {result}")
+            except Exception:
+                logger.exception("Games archive compaction failed")
+            await asyncio.sleep(self.__interval_sec)
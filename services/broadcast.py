@@ -0,0 +1,200 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Set, Tuple
+
+# Pending frames per subscriber, the oldest are dropped beyond
+SUBSCRIBER_QUEUE_SIZE = 32
+
+
+def encode_sse(event: str, data: str) -> bytes:
+    """Encode Server-Sent Events frame"""
+    lines = "".join(f"data: {line}\r\n" for line in data.splitlines() or [""])
+    return f"event: {event}\r\n{lines}\r\n".encode("utf-8")
+
+
+class BroadcastSubscriber:
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        """Encoded frames queue of one subscriber, publisher never waits
+
+        Beyond [maxsize] the oldest frame is dropped and subscriber is marked
+        `lagged`, so its writer can replace what is left with a fresh snapshot.
+
+        Args:
+            maxsize (int, optional): Pending frames limit. Defaults to SUBSCRIBER_QUEUE_SIZE.
+        """
+        self.dropped = 0
+        self.lagged = False
+        self.__maxsize = maxsize
+        self.__frames: Deque[bytes] = deque()
+        self.__ready = asyncio.Event()
+        self.__closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def qsize(self) -> int:
+        return len(self.__frames)
+
+    def push(self, frame: bytes) -> None:
+        if self.__closed:
+            return
+        if len(self.__frames) >= self.__maxsize:
+            self.__frames.popleft()
+            self.dropped += 1
+            self.lagged = True
+        self.__frames.append(frame)
+        self.__ready.set()
+
+    def resync(self) -> bool:
+        """Drop pending frames of lagged subscriber, they are covered by snapshot
+
+        Returns:
+            bool: Subscriber was lagged and needs snapshot
+        """
+        if not self.lagged or self.__closed:
+            return False
+        self.dropped += len(self.__frames)
+        self.__frames.clear()
+        self.lagged = False
+        return True
+
+    def close(self, frame: Optional[bytes] = None) -> None:
+        """Stop accepting frames, [frame] is delivered after pending ones"""
+        if self.__closed:
+            return
+        if frame is not None:
+            self.__frames.append(frame)
+        self.__closed = True
+        self.__ready.set()
+
+    async def get(self) -> Optional[bytes]:
+        """Next frame, `None` once closed and drained"""
+        while not self.__frames:
+            if self.__closed:
+                return None
+            self.__ready.clear()
+            await self.__ready.wait()
+        return self.__frames.popleft()
+
+
+@dataclass
+class BroadcastStats:
+    # Games with subscribers
+    channels: int = 0
+    subscribers: int = 0
+    # Frames encoded by publish, each written to all game subscribers
+    published: int = 0
+    # Subscribers refused by per game limit
+    refused: int = 0
+
+
+class _Channel:
+    def __init__(self) -> None:
+        self.subscribers: Set[BroadcastSubscriber] = set()
+        # (revision, frame) of the latest snapshot
+        self.snapshot: Optional[Tuple[int, bytes]] = None
+
+
+class BroadcastHub:
+    def __init__(
+        self,
+        max_subscribers: int = 5_000,
+        queue_size: int = SUBSCRIBER_QUEUE_SIZE,
+    ) -> None:
+        """Per game fan-out of SSE frames to subscribers of this process
+
+        Every frame is encoded once and the same `bytes` is queued to all
+        game subscribers.
+
+        Args:
+            max_subscribers (int, optional): Subscribers per game. Defaults to 5_000.
+            queue_size (int, optional): Pending frames per subscriber.
+            Defaults to SUBSCRIBER_QUEUE_SIZE.
+        """
+        self.__max_subscribers = max_subscribers
+        self.__queue_size = queue_size
+        self.__channels: Dict[str, _Channel] = {}
+        self.__stats = BroadcastStats()
+
+    @property
+    def stats(self) -> BroadcastStats:
+        self.__stats.channels = len(self.__channels)
+        self.__stats.subscribers = sum(
+            len(channel.subscribers) for channel in self.__channels.values()
+        )
+        return self.__stats
+
+    def subscribers(self, game_id: str) -> int:
+        channel = self.__channels.get(game_id)
+        return len(channel.subscribers) if channel else 0
+
+    def subscribe(self, game_id: str) -> Optional[BroadcastSubscriber]:
+        """Subscribe to game frames, `None` when game has too many subscribers"""
+        channel = self.__channels.setdefault(game_id, _Channel())
+        if len(channel.subscribers) >= self.__max_subscribers:
+            self.__stats.refused += 1
+            return None
+        subscriber = BroadcastSubscriber(maxsize=self.__queue_size)
+        channel.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, game_id: str, subscriber: BroadcastSubscriber) -> None:
+        subscriber.close()
+        channel = self.__channels.get(game_id)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            del self.__channels[game_id]
+
+    def publish(self, game_id: str, event: str, data: Callable[[], str]) -> None:
+        """Queue frame to all game subscribers
+
+        Args:
+            game_id (str): Game id
+            event (str): SSE event name
+            data (Callable[[], str]): Event data factory, not called without subscribers
+        """
+        channel = self.__channels.get(game_id)
+        if not channel or not channel.subscribers:
+            return
+        frame = encode_sse(event, data())
+        self.__stats.published += 1
+        for subscriber in channel.subscribers:
+            subscriber.push(frame)
+
+    def snapshot(self, game_id: str, revision: int, data: Callable[[], str]) -> bytes:
+        """Snapshot frame of game state [revision], encoded once per revision
+
+        Args:
+            game_id (str): Game id
+            revision (int): Game state revision
+            data (Callable[[], str]): Snapshot data factory
+
+        Returns:
+            bytes: `snapshot` SSE frame
+        """
+        channel = self.__channels.get(game_id)
+        if channel and channel.snapshot and channel.snapshot[0] == revision:
+            return channel.snapshot[1]
+        frame = encode_sse("snapshot", data())
+        if channel:
+            channel.snapshot = (revision, frame)
+        return frame
+
+    def close(self, game_id: str, event: str, data: str) -> None:
+        """Send final frame to all game subscribers and close them"""
+        channel = self.__channels.pop(game_id, None)
+        if not channel:
+            return
+        frame = encode_sse(event, data)
+        for subscriber in channel.subscribers:
+            subscriber.close(frame)
+
+    def close_all(self) -> None:
+        for channel in self.__channels.values():
+            for subscriber in channel.subscribers:
+                subscriber.close()
+        self.__channels.clear()
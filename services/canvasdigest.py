@@ -0,0 +1,57 @@
+import zlib
+from dataclasses import dataclass
+from typing import Dict
+
+
+def canvas_digest(data: bytes) -> int:
+    """Fast non-cryptographic image digest: CRC32 combined with data length
+
+    Args:
+        data (bytes): Image bytes
+
+    Returns:
+        int: Digest
+    """
+    return (len(data) << 32) | zlib.crc32(data)
+
+
+@dataclass
+class CanvasDigestStats:
+    # Images checked against published digest
+    checked: int = 0
+    # Identical images skipped
+    skipped: int = 0
+
+
+class CanvasDigestCache:
+    def __init__(self) -> None:
+        """Digest of the last published canvas per game"""
+        self.__digests: Dict[str, int] = {}
+        self.stats = CanvasDigestStats()
+
+    def __len__(self) -> int:
+        return len(self.__digests)
+
+    def is_published(self, game_id: str, digest: int) -> bool:
+        """Check canvas with [digest] is already published for game
+
+        Args:
+            game_id (str): Game id
+            digest (int): Canvas digest
+
+        Returns:
+            bool: Canvas is identical to published one
+        """
+        self.stats.checked += 1
+        if self.__digests.get(game_id) == digest:
+            self.stats.skipped += 1
+            return True
+        return False
+
+    def published(self, game_id: str, digest: int) -> None:
+        """Remember published canvas [digest] for game"""
+        self.__digests[game_id] = digest
+
+    def evict(self, game_id: str) -> None:
+        """Forget game digest"""
+        self.__digests.pop(game_id, None)
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from logger import logger
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LatestWinsScheduler(Generic[K, V]):
+    def __init__(
+        self, flush: Callable[[K, V], Awaitable[None]], interval_sec: float
+    ) -> None:
+        """Per-key debounce: keeps only the latest pending value for each key
+        and flushes it at most once per [interval_sec]
+
+        Args:
+            flush (Callable[[K, V], Awaitable[None]]): Flush callback
+            interval_sec (float): Minimal interval between flushes of the same key
+        """
+        self.__flush = flush
+        self.__interval_sec = interval_sec
+        self.__pending: Dict[K, V] = {}
+        self.__workers: Dict[K, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def submit(self, key: K, value: V) -> None:
+        """Schedule [value] flush for [key], replacing pending one
+
+        Args:
+            key (K): Key
+            value (V): Value
+        """
+        self.__pending[key] = value
+        if key not in self.__workers:
+            self.__workers[key] = asyncio.create_task(self.__worker(key))
+
+    def retry(self, key: K, value: V) -> None:
+        """Schedule failed [value] flush again, unless newer value is pending
+
+        Args:
+            key (K): Key
+            value (V): Value
+        """
+        if key not in self.__pending:
+            self.submit(key, value)
+
+    def discard(self, key: K) -> None:
+        """Drop pending value and stop flushing [key]
+
+        Args:
+            key (K): Key
+        """
+        self.__pending.pop(key, None)
+        worker = self.__workers.pop(key, None)
+        if worker:
+            worker.cancel()
+
+    async def close(self) -> None:
+        """Cancel all pending flushes"""
+        workers = list(self.__workers.values())
+        self.__pending.clear()
+        self.__workers.clear()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def __worker(self, key: K) -> None:
+        try:
+            while key in self.__pending:
+                value = self.__pending.pop(key)
+                try:
+                    await self.__flush(key, value)
+                except Exception:
+                    logger.exception(f"Flush failed for {key}")
+                await asyncio.sleep(self.__interval_sec)
+        finally:
+            if self.__workers.get(key) is asyncio.current_task():
+                self.__workers.pop(key, None)
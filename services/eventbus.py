@@ -0,0 +1,159 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from psycopg import AsyncConnection, sql
+
+from database import Database
+from logger import logger
+
+# (channel, payload)
+EventHandler = Callable[[str, str], None]
+# Called once listening (re)started
+ListenHandler = Callable[[], Awaitable[None]]
+
+# Postgres NOTIFY payload must be shorter than 8000 bytes
+MAX_NOTIFY_BYTES = 7999
+
+
+class EventBus(Protocol):
+    async def start(
+        self, handler: EventHandler, on_listen: Optional[ListenHandler] = None
+    ) -> None:
+        """Start delivering published events to [handler]
+
+        Args:
+            handler (EventHandler): Events handler
+            on_listen (Optional[ListenHandler], optional): Awaited after listening
+            (re)started, events published while bus was disconnected are lost,
+            so state has to be reloaded. Defaults to None.
+        """
+        raise NotImplementedError
+
+    async def publish(self, channel: str, payload: str) -> None:
+        """Publish [payload] to all processes listening the bus
+
+        Args:
+            channel (str): Channel, e.g. game id
+            payload (str): Event payload
+        """
+        raise NotImplementedError
+
+    def fits(self, channel: str, payload: str) -> bool:
+        """Check [payload] is within bus message size limit"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Stop delivering events"""
+        raise NotImplementedError
+
+
+class InProcessEventBus(EventBus):
+    """Event bus within single process"""
+
+    def __init__(self) -> None:
+        self.__handler: Optional[EventHandler] = None
+
+    async def start(
+        self, handler: EventHandler, on_listen: Optional[ListenHandler] = None
+    ) -> None:
+        # Nothing is missed within process
+        self.__handler = handler
+
+    async def publish(self, channel: str, payload: str) -> None:
+        if self.__handler:
+            self.__handler(channel, payload)
+
+    def fits(self, channel: str, payload: str) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self.__handler = None
+
+
+class PostgresEventBus(EventBus):
+    def __init__(
+        self,
+        db: Database,
+        connection_string: str,
+        pg_channel: str = "drawguessr_events",
+        reconnect_delay_sec: float = 1,
+    ) -> None:
+        """Event bus over Postgres `LISTEN/NOTIFY`, delivers events across processes
+
+        Events are published with `pg_notify` thru [db] pool
+        and received on a dedicated connection.
+        Notification payload is limited by Postgres to 8000 bytes.
+
+        Args:
+            db (Database): Database instance, used for publishing
+            connection_string (str): Database connection string, used for listening
+            pg_channel (str, optional): Postgres notification channel. Defaults to "drawguessr_events".
+            reconnect_delay_sec (float, optional): Listener reconnect delay. Defaults to 1.
+        """
+        self.__db = db
+        self.__conn_info = connection_string
+        self.__pg_channel = pg_channel
+        self.__reconnect_delay_sec = reconnect_delay_sec
+        self.__listener: Optional[asyncio.Task] = None
+
+    async def start(
+        self, handler: EventHandler, on_listen: Optional[ListenHandler] = None
+    ) -> None:
+        listening = asyncio.Event()
+        self.__listener = asyncio.create_task(
+            self.__listen(handler, on_listen, listening)
+        )
+        await listening.wait()
+
+    async def publish(self, channel: str, payload: str) -> None:
+        await self.__db.sql(
+            "SELECT pg_notify(%s, %s)",
+            (self.__pg_channel, self.__envelope(channel, payload)),
+        )
+
+    def fits(self, channel: str, payload: str) -> bool:
+        return len(self.__envelope(channel, payload).encode("utf-8")) <= MAX_NOTIFY_BYTES
+
+    def __envelope(self, channel: str, payload: str) -> str:
+        return json.dumps({"c": channel, "p": payload})
+
+    async def close(self) -> None:
+        if self.__listener:
+            self.__listener.cancel()
+            await asyncio.gather(self.__listener, return_exceptions=True)
+            self.__listener = None
+
+    async def __listen(
+        self,
+        handler: EventHandler,
+        on_listen: Optional[ListenHandler],
+        listening: asyncio.Event,
+    ) -> None:
+        while True:
+            try:
+                async with await AsyncConnection.connect(
+                    self.__conn_info, autocommit=True
+                ) as con:
+                    await con.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.__pg_channel))
+                    )
+                    # Notifications are buffered by connection meanwhile,
+                    # failed resync is retried with reconnect
+                    if on_listen:
+                        await on_listen()
+                    listening.set()
+                    async for notify in con.notifies():
+                        self.__dispatch(handler, notify.payload)
+            except Exception:
+                logger.exception("Event bus listener disconnected")
+                # Don't block startup while database is unreachable
+                listening.set()
+                await asyncio.sleep(self.__reconnect_delay_sec)
+
+    def __dispatch(self, handler: EventHandler, raw: str) -> None:
+        try:
+            message: dict[str, Any] = json.loads(raw)
+            handler(message["c"], message["p"])
+        except Exception:
+            logger.exception(f"Event bus message handling failed: {raw}")
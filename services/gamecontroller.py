@@ -1,24 +1,52 @@
 import asyncio
-import re
+import json
+import time
 import uuid
-from typing import NamedTuple, Optional
+import zlib
+from collections import deque
+from dataclasses import asdict
+from typing import Any, Deque, List, NamedTuple, Optional, Union
 
 from aiogram import Bot, types
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.utils.i18n import I18n
-from aiogram.utils.web_app import WebAppInitData, safe_parse_webapp_init_data
+from aiogram.utils.web_app import WebAppInitData
 
 from common.enumcompat import StrEnum
 from config import config
 from database import Database, Game
+from logger import logger
+from services.broadcast import (BroadcastHub, BroadcastStats,
+                                BroadcastSubscriber, encode_sse)
+from services.canvasdigest import (CanvasDigestCache, CanvasDigestStats,
+                                   canvas_digest)
+from services.coalescer import LatestWinsScheduler
+from services.eventbus import EventBus, InProcessEventBus
+from services.gameregistry import ActiveGame, ActiveGameRegistry
+from services.imagepipeline import ImagePipeline, ImageStats
+from services.initdatacache import InitDataCache
+from services.messagetemplates import GameMessage, GameMessageTemplates
+from services.outbound import OutboundScheduler, OutboundStats, Priority
+from services.rasterizer import CanvasRenderer, StrokesSnapshot
+from services.strokelog import (StrokeOp, dump_strokes, parse_strokes,
+                               split_strokes)
+from services.wordmatcher import WordMatcher
 from services.wordprovider import WordProvider
 
 
+# Host canvas size limit, in pixels
+MAX_CANVAS_SIDE = 4096
+# Pending events per SSE connection
+SESSION_QUEUE_SIZE = 16
+
+
 class GameWordStatus(StrEnum):
     Ok = "ok"
     NotHost = "not_host"
     Ended = "ended"
     NotAuth = "not_auth"
     AlreadyConnected = "already_connected"
+    TooManySpectators = "too_many_spectators"
 
 
 class GameWordResult(NamedTuple):
@@ -26,22 +54,108 @@ class GameWordResult(NamedTuple):
     status: GameWordStatus
 
 
+class StrokesStatus(StrEnum):
+    Ok = "ok"
+    Rejected = "rejected"
+    # Event bus is unavailable, batch may be sent again
+    Unavailable = "unavailable"
+
+
 class GameEventType(StrEnum):
     Word = "word"
     Error = "error"
     Disconnect = "disconnect"
 
 
+class GameStateChange(StrEnum):
+    """Game changes shared between processes thru event bus"""
+
+    Created = "created"
+    MessageUpdated = "message_updated"
+    Finished = "finished"
+
+
 class GameEvent(NamedTuple):
     type: GameEventType
     data: str
 
 
-class SessionQueue(asyncio.Queue):
-    def __init__(self, maxsize: int = 0) -> None:
-        super().__init__(maxsize)
+class CanvasImage(NamedTuple):
+    data: Union[bytes, bytearray]
+    filename: str
+    digest: int
+
+
+class StrokesCanvas(NamedTuple):
+    """Canvas to be rendered from game stroke log"""
+
+    revision: int
+
+
+SessionEvent = Union[GameEvent, GameEventType]
+
+
+class SessionQueue:
+    def __init__(self, maxsize: int = SESSION_QUEUE_SIZE) -> None:
+        """Bounded game events queue of SSE connection, producers never wait
+
+        Only the latest `Word` event is kept. `Error` and `Disconnect` are terminal:
+        pending events are dropped and the queue accepts nothing after them.
+        Beyond [maxsize] the oldest event is dropped.
+
+        Args:
+            maxsize (int, optional): Pending events limit. Defaults to SESSION_QUEUE_SIZE.
+        """
         self.session_id: Optional[str] = None
         self.request_id: Optional[str] = None
+        # Events dropped by coalescing, overflow or after terminal event
+        self.dropped = 0
+        self.__maxsize = maxsize
+        self.__events: Deque[SessionEvent] = deque()
+        self.__ready = asyncio.Event()
+        self.__closed = False
+
+    @property
+    def closed(self) -> bool:
+        """Terminal event is queued"""
+        return self.__closed
+
+    def qsize(self) -> int:
+        return len(self.__events)
+
+    def put_nowait(self, event: SessionEvent) -> None:
+        if self.__closed:
+            self.dropped += 1
+            return
+
+        event_type = event if isinstance(event, GameEventType) else event.type
+        if event_type in (GameEventType.Error, GameEventType.Disconnect):
+            self.__closed = True
+            self.dropped += len(self.__events)
+            self.__events.clear()
+        elif event_type == GameEventType.Word:
+            pending = len(self.__events)
+            self.__events = deque(
+                e
+                for e in self.__events
+                if isinstance(e, GameEventType) or e.type != GameEventType.Word
+            )
+            self.dropped += pending - len(self.__events)
+
+        if len(self.__events) >= self.__maxsize:
+            self.__events.popleft()
+            self.dropped += 1
+        self.__events.append(event)
+        self.__ready.set()
+
+    async def put(self, event: SessionEvent) -> None:
+        self.put_nowait(event)
+
+    async def get(self) -> SessionEvent:
+        while not self.__events:
+            self.__ready.clear()
+            await self.__ready.wait()
+        return self.__events.popleft()
 
 
 class GameController:
@@ -51,7 +165,19 @@ class GameController:
         db: Database,
         i18n: I18n,
         word_provider: WordProvider,
-        initial_canvas_file_id: str,
+        initial_canvas_file_id: Optional[str] = None,
+        initial_canvas_path: str = "./resources/empty_canvas.jpg",
+        canvas_update_interval_sec: float = 3,
+        event_bus: Optional[EventBus] = None,
+        canvas_renderer: Optional[CanvasRenderer] = None,
+        image_pipeline: Optional[ImagePipeline] = None,
+        outbound: Optional[OutboundScheduler] = None,
+        broadcast: Optional[BroadcastHub] = None,
+        stale_game_ttl_sec: float = 1800,
+        stale_game_sweep_interval_sec: float = 60,
+        stale_game_sweep_limit: int = 100,
+        worker_idx: int = 0,
+        workers: int = 1,
     ) -> None:
         """Draw&Guess game controller
 
@@ -60,15 +186,131 @@ class GameController:
             db (Database): Database instance
             i18n (I18n): i18n localization instance
             word_provider (WordProvider): Word provider
-            initial_canvas_file_id (str): Initial empty image `file_id`
+            initial_canvas_file_id (Optional[str], optional): Initial empty image `file_id`.
+            Defaults to `file_id` of [initial_canvas_path] uploaded on first use.
+            initial_canvas_path (str, optional): Initial empty image file.
+            Defaults to "./resources/empty_canvas.jpg".
+            canvas_update_interval_sec (float, optional): Minimal interval between
+            game message photo edits, only latest canvas is sent. Defaults to 3.
+            event_bus (Optional[EventBus], optional): Game events bus, required to
+            deliver events between processes. Defaults to in-process bus.
+            canvas_renderer (Optional[CanvasRenderer], optional): Renders game
+            stroke logs into game message photo. Defaults to CanvasRenderer().
+            image_pipeline (Optional[ImagePipeline], optional): Normalizes uploaded
+            canvas images before sending. Defaults to ImagePipeline().
+            outbound (Optional[OutboundScheduler], optional): Rate limits and
+            prioritizes Telegram API calls. Defaults to OutboundScheduler().
+            broadcast (Optional[BroadcastHub], optional): Fans out game strokes
+            to spectators of this process. Defaults to BroadcastHub().
+            stale_game_ttl_sec (float, optional): Games without canvas updates and
+            subscriber for this long are finished. Defaults to 1800.
+            stale_game_sweep_interval_sec (float, optional): Stale games sweep interval.
+            Defaults to 60.
+            stale_game_sweep_limit (int, optional): Games finished per sweep at most.
+            Defaults to 100.
+            worker_idx (int, optional): Index of this process among [workers].
+            Defaults to 0.
+            workers (int, optional): Processes sharing games thru event bus, each
+            game message photo is published by one of them. Defaults to 1.
         """
         self.__bot = bot
         self.__db = db
         self.__i18n = i18n
         self.__word_provider = word_provider
         self.__initial_canvas_file_id = initial_canvas_file_id
-        self.__regex_cache: dict[str, re.Pattern] = {}
-        self.__game_listener: dict[str, SessionQueue[GameEvent]] = {}
+        self.__initial_canvas_path = initial_canvas_path
+        self.__init_data_cache = InitDataCache(token=bot.token)
+        self.__games = ActiveGameRegistry()
+        self.__word_matcher = WordMatcher()
+        self.__canvas_digests = CanvasDigestCache()
+        self.__canvas_updates = LatestWinsScheduler[
+            str, Union[CanvasImage, StrokesCanvas]
+        ](
+            flush=self.__publish_canvas, interval_sec=canvas_update_interval_sec
+        )
+        self.__game_listener: dict[str, SessionQueue] = {}
+        self.__event_bus = event_bus or InProcessEventBus()
+        self.__canvas_renderer = canvas_renderer or CanvasRenderer()
+        self.__image_pipeline = image_pipeline or ImagePipeline()
+        self.__outbound = outbound or OutboundScheduler()
+        self.__broadcast = broadcast or BroadcastHub()
+        self.__templates = GameMessageTemplates(
+            i18n=i18n, web_app_url=config.telegram_bot_web_app_url
+        )
+        self.__worker_idx = worker_idx
+        self.__workers = workers
+        self.__stale_game_ttl_sec = stale_game_ttl_sec
+        self.__stale_game_sweep_interval_sec = stale_game_sweep_interval_sec
+        self.__stale_game_sweep_limit = stale_game_sweep_limit
+        self.__sweeper: Optional[asyncio.Task] = None
+        self.__notifications: set[asyncio.Task] = set()
+
+    async def start(self, reap_stale_games: bool = True) -> None:
+        """Load active games from database and start listening game events
+
+        Args:
+            reap_stale_games (bool, optional): Finish stale games of all processes,
+            enable in one process only. Defaults to True.
+        """
+        self.__games.warm(await self.__db.get_active_games())
+        await self.__event_bus.start(self.__on_game_event, on_listen=self.resync)
+        self.__sweeper = asyncio.create_task(self.__sweep(reap_stale_games))
+
+    async def resync(self) -> None:
+        """Reload active games from database, e.g. after event bus reconnect.
+        Games created or finished by other processes meanwhile are applied"""
+        known = self.__games.entries()
+        games = await self.__db.get_active_games()
+        active = {game.game_id for game in games}
+        # Games registered during the query are not in [known]
+        for entry in known:
+            if entry.game.game_id not in active:
+                self.__forget_game(entry.game)
+        for game in games:
+            entry = self.__games.by_game_id(game.game_id)
+            if entry:
+                entry.game.message_id = game.message_id
+            else:
+                self.__games.put(game)
+
+    @property
+    def canvas_digest_stats(self) -> CanvasDigestStats:
+        """Identical canvas uploads counters"""
+        return self.__canvas_digests.stats
+
+    @property
+    def image_stats(self) -> ImageStats:
+        """Uploaded canvas images bytes in vs. bytes out, all games"""
+        return self.__image_pipeline.total
+
+    @property
+    def outbound_stats(self) -> OutboundStats:
+        """Telegram API calls counters and queue depth"""
+        return self.__outbound.stats
+
+    @property
+    def broadcast_stats(self) -> BroadcastStats:
+        """Spectators and frames counters"""
+        return self.__broadcast.stats
+
+    def game_image_stats(self, game_id: str) -> Optional[ImageStats]:
+        """Uploaded canvas images bytes in vs. bytes out of game"""
+        return self.__image_pipeline.stats(game_id)
+
+    async def close(self) -> None:
+        """Cancel pending background work"""
+        if self.__sweeper:
+            self.__sweeper.cancel()
+            await asyncio.gather(self.__sweeper, return_exceptions=True)
+            self.__sweeper = None
+        for task in list(self.__notifications):
+            task.cancel()
+        await asyncio.gather(*self.__notifications, return_exceptions=True)
+        await self.__event_bus.close()
+        await self.__canvas_updates.close()
+        await self.__outbound.close()
+        self.__image_pipeline.close()
+        self.__broadcast.close_all()
 
     def extract_init_data(self, init_data: str) -> Optional[WebAppInitData]:
         """Extract Telegram Web App initData safe string
@@ -79,14 +321,9 @@ class GameController:
         Returns:
             Optional[WebAppInitData]: WebAppInitData
         """
-        try:
-            return safe_parse_webapp_init_data(
-                token=self.__bot.token, init_data=init_data
-            )
-        except ValueError:
-            return None
+        return self.__init_data_cache.parse(init_data=init_data)
 
-    async def sub(self, init_data: str, game_id: str) -> SessionQueue[GameEvent]:
+    async def sub(self, init_data: str, game_id: str) -> SessionQueue:
         """Subscribe to game events
 
         Args:
@@ -94,9 +331,9 @@ class GameController:
             game_id (str): Game id
 
         Returns:
-            asyncio.Queue[GameEvent]: Event queue
+            SessionQueue: Event queue
         """
-        queue = SessionQueue[GameEvent]()
+        queue = SessionQueue()
         safe_init_data = self.extract_init_data(init_data=init_data)
 
         if not safe_init_data:
@@ -106,7 +343,7 @@ class GameController:
         queue.session_id = safe_init_data.hash
         queue.request_id = str(uuid.uuid4())
 
-        game = await self.__db.get_game(game_id=game_id)
+        game = await self.__get_game(game_id=game_id)
         if not game:
             await queue.put(GameEvent(GameEventType.Error, GameWordStatus.Ended))
             return queue
@@ -128,6 +365,12 @@ class GameController:
 
         self.__game_listener[game_id] = queue
         await queue.put(GameEvent(GameEventType.Word, game.word))
+        # Same session listeners in other processes
+        await self.__publish_event(
+            game_id,
+            GameEvent(GameEventType.Disconnect, queue.request_id),
+            session_id=queue.session_id,
+        )
 
         return queue
 
@@ -149,6 +392,63 @@ class GameController:
         ):
             self.__game_listener.pop(game_id, None)
 
+    async def watch(self, init_data: str, game_id: str) -> BroadcastSubscriber:
+        """Subscribe to game strokes as spectator
+
+        Subscriber receives `snapshot` of current strokes, then `strokes` batches.
+        Errors are sent as final `error` frame.
+
+        Args:
+            init_data (str): Telegram Web App initData safe string
+            game_id (str): Game id
+
+        Returns:
+            BroadcastSubscriber: Frames queue
+        """
+
+        def refused(status: GameWordStatus) -> BroadcastSubscriber:
+            subscriber = BroadcastSubscriber()
+            subscriber.close(encode_sse(GameEventType.Error, status))
+            return subscriber
+
+        if not self.extract_init_data(init_data=init_data):
+            return refused(GameWordStatus.NotAuth)
+
+        game = await self.__get_game(game_id=game_id)
+        if not game:
+            return refused(GameWordStatus.Ended)
+
+        subscriber = self.__broadcast.subscribe(game_id)
+        if subscriber is None:
+            return refused(GameWordStatus.TooManySpectators)
+
+        snapshot = self.spectator_snapshot(game_id)
+        if snapshot:
+            subscriber.push(snapshot)
+        return subscriber
+
+    def unwatch(self, game_id: str, subscriber: BroadcastSubscriber) -> None:
+        """Unsubscribe spectator from game strokes"""
+        self.__broadcast.unsubscribe(game_id, subscriber)
+
+    def spectator_snapshot(self, game_id: str) -> Optional[bytes]:
+        """Encoded `snapshot` frame of game strokes since last canvas clear"""
+        entry = self.__games.by_game_id(game_id)
+        if entry is None:
+            return None
+        log = entry.strokes
+        return self.__broadcast.snapshot(
+            game_id,
+            log.revision,
+            lambda: json.dumps(
+                {
+                    "strokes": dump_strokes(log.strokes),
+                    "width": log.width,
+                    "height": log.height,
+                }
+            ),
+        )
+
     async def create_game(self, group_id: int, owner_id: int, owner_name: str) -> None:
         """Create new game
 
@@ -157,22 +457,13 @@ class GameController:
             owner_id (int): Requested owner (user) id for a game
             owner_name (str): Requested owner (user) name for a game
         """
-        already_running_game = await self.__db.get_group_game(group_id=group_id)
+        already_running_game = await self.__get_group_game(group_id=group_id)
         if already_running_game:
-            _ = self.__i18n.gettext
-            try:
-                await self.__bot.send_message(
-                    chat_id=already_running_game.group_id,
-                    reply_to_message_id=already_running_game.message_id,
-                    text=_("The game has already started"),
-                )
-            except Exception:
-                pass
-
+            await self.__notify_already_started(game=already_running_game)
             return
 
-        word = await self.__word_provider.generate()
-        self.__regex_cache[group_id] = re.compile(word, re.IGNORECASE)
+        locale = self.__i18n.current_locale
+        word = await self.__word_provider.generate(locale=locale, group_id=group_id)
         game = await self.__db.create_game(
             game_id=self.__generate_game_id(),
             group_id=group_id,
@@ -180,108 +471,145 @@ class GameController:
             owner_name=owner_name,
             word=word,
         )
+        if game is None:
+            # Created concurrently
+            already_running_game = await self.__db.get_group_game(group_id=group_id)
+            if already_running_game:
+                self.__games.put(already_running_game)
+                await self.__notify_already_started(game=already_running_game)
+            return
 
-        _ = self.__i18n.gettext
+        entry = self.__games.put(game)
+        entry.locale = locale
+        self.__word_matcher.add(game_id=game.game_id, word=word, locale=locale)
+        message = self.__game_message(entry)
 
-        game_message = await self.__bot.send_photo(
-            chat_id=group_id,
-            photo=self.__initial_canvas_file_id,
-            caption=_(
-                "<a href='tg://user?id={owner_id}'>{owner_name}</a> draws for guessing"
-            ).format(owner_id=owner_id, owner_name=owner_name),
-            reply_markup=types.InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        types.InlineKeyboardButton(
-                            text=_("Start drawing"),
-                            url=f"{config.telegram_bot_web_app_url}?startapp={game.game_id}",
-                        )
-                    ]
-                ]
+        photo = self.__initial_canvas_file_id or types.FSInputFile(
+            self.__initial_canvas_path
+        )
+        game_message = await self.__outbound.call(
+            group_id,
+            Priority.Message,
+            lambda: self.__bot.send_photo(
+                chat_id=group_id,
+                photo=photo,
+                caption=message.caption,
+                reply_markup=message.reply_markup,
             ),
         )
+        if self.__initial_canvas_file_id is None and game_message.photo:
+            self.__initial_canvas_file_id = game_message.photo[-1].file_id
 
         await self.__db.update_game_message(
             game_id=game.id, new_message_id=game_message.message_id
         )
+        game.message_id = game_message.message_id
+        await self.__publish_state(GameStateChange.Created, game, locale=locale)
+
+    def is_canvas_publisher(self, game_id: str) -> bool:
+        """This process publishes game message photo of [game_id]
+
+        Host requests are spread over processes, so a single process per game
+        submits canvases to the coalescer: its chat debounce, digests and resend
+        see all updates. Others only replicate the stroke log.
+        """
+        return zlib.crc32(game_id.encode()) % self.__workers == self.__worker_idx
 
-    async def update_state(self, init_data: str, game_id: str, image) -> bool:
+    async def is_host(self, init_data: str, game_id: str) -> bool:
+        """Check user of [init_data] hosts active game with [game_id]
+
+        Args:
+            init_data (str): Telegram Web App initData safe string
+            game_id (str): Game id
+
+        Returns:
+            bool: User is host
+        """
+        game = await self.__get_host_game(init_data=init_data, game_id=game_id)
+        return game is not None
+
+    async def update_state(
+        self,
+        init_data: str,
+        game_id: str,
+        data: Union[bytes, bytearray],
+        filename: str,
+    ) -> bool:
         """Update game state
 
         Args:
             init_data (str): Telegram Web App initData safe string
             game_id (str): Game id
-            image (_type_): Updated canvas image
+            data (Union[bytes, bytearray]): Updated canvas image, kept without copying
+            filename (str): Canvas image filename
 
         Returns:
-            bool: State has been updated
+            bool: State has been updated, `False` in other than canvas publisher process
         """
-        safe_init_data = self.extract_init_data(init_data=init_data)
-        if not safe_init_data:
+        game = await self.__get_host_game(init_data=init_data, game_id=game_id)
+        if game is None or not self.is_canvas_publisher(game.game_id):
             return False
 
-        game = await self.__db.get_game(game_id=game_id)
+        # Reaper may run in another process, activity is shared thru event bus.
+        # Every process sees the same touches, so recent one needs no repeat
+        entry = self.__games.by_game_id(game.game_id)
+        if (
+            entry is None
+            or time.time() - entry.last_activity
+            >= self.__stale_game_sweep_interval_sec / 2
+        ):
+            await self.__publish(game.game_id, {"touch": True})
+        self.__canvas_updates.submit(
+            game.game_id,
+            CanvasImage(data=data, filename=filename, digest=canvas_digest(data)),
+        )
+        return True
+
+    async def update_strokes(
+        self, init_data: str, game_id: str, strokes: Any, width: int, height: int
+    ) -> StrokesStatus:
+        """Append host strokes batch to game stroke log
+
+        Args:
+            init_data (str): Telegram Web App initData safe string
+            game_id (str): Game id
+            strokes (Any): Decoded JSON strokes batch, see `parse_strokes`
+            width (int): Host canvas width
+            height (int): Host canvas height
+
+        Returns:
+            StrokesStatus: `Unavailable` when batch may be sent again
+        """
+        game = await self.__get_host_game(init_data=init_data, game_id=game_id)
         if game is None:
-            return False
+            return StrokesStatus.Rejected
 
-        if game.owner_id != safe_init_data.user.id:
-            return False
+        if not (0 < width <= MAX_CANVAS_SIDE and 0 < height <= MAX_CANVAS_SIDE):
+            return StrokesStatus.Rejected
 
-        media_image = types.BufferedInputFile(
-            image.file.read(), filename=image.filename
-        )
-        try_resend = False
-        _ = self.__i18n.gettext
         try:
-            await self.__bot.edit_message_media(
-                media=types.InputMediaPhoto(
-                    media=media_image,
-                    caption=_(
-                        "<a href='tg://user?id={owner_id}'>{owner_name}</a> draws for guessing"
-                    ).format(owner_id=game.owner_id, owner_name=game.owner_name),
-                ),
-                chat_id=game.group_id,
-                message_id=game.message_id,
-                reply_markup=types.InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            types.InlineKeyboardButton(
-                                text=_("Start drawing"),
-                                url=f"{config.telegram_bot_web_app_url}?startapp={game.game_id}",
-                            )
-                        ]
-                    ]
-                ),
-            )
-        except Exception:
-            try_resend = True
+            ops = parse_strokes(strokes)
+        except ValueError:
+            return StrokesStatus.Rejected
 
-        if try_resend:
-            try:
-                new_message = await self.__bot.send_photo(
-                    chat_id=game.group_id,
-                    photo=media_image,
-                    caption=_(
-                        "<a href='tg://user?id={owner_id}'>{owner_name}</a> draws for guessing"
-                    ).format(owner_id=game.owner_id, owner_name=game.owner_name),
-                    reply_markup=types.InlineKeyboardMarkup(
-                        inline_keyboard=[
-                            [
-                                types.InlineKeyboardButton(
-                                    text=_("Start drawing"),
-                                    url=f"{config.telegram_bot_web_app_url}?startapp={game.game_id}",
-                                )
-                            ]
-                        ]
-                    ),
-                )
-                await self.__db.update_game_message(
-                    game_id=game.id, new_message_id=new_message.message_id
-                )
-            except Exception:
-                return False
+        entry = self.__games.by_game_id(game_id)
+        if entry is None or not entry.strokes.fits(ops):
+            return StrokesStatus.Rejected
 
-        return True
+        try:
+            payloads = self.__strokes_payloads(game_id, ops, width, height)
+        except ValueError:
+            return StrokesStatus.Rejected
+
+        # Stroke log is replicated to every process thru event bus.
+        # No local fallback: host sends failed batch again
+        try:
+            for payload in payloads:
+                await self.__event_bus.publish(game_id, payload)
+        except Exception:
+            logger.exception(f"Publishing strokes failed for {game_id}")
+            return StrokesStatus.Unavailable
+        return StrokesStatus.Ok
 
     async def check_word(
         self, group_id: int, message_id: int, user_id: int, text: str
@@ -294,32 +622,37 @@ class GameController:
             user_id (int): User id
             text (str): Message text
         """
-        game = await self.__db.get_group_game(group_id=group_id)
+        game = await self.__get_group_game(group_id=group_id)
         if game is None:
             return
 
         if game.owner_id == user_id:
             return
 
-        regex = self.__regex_cache.get(game.game_id)
-        if not regex:
-            regex = re.compile(game.word, re.IGNORECASE)
-            self.__regex_cache[game.game_id] = regex
+        if game.game_id not in self.__word_matcher:
+            self.__word_matcher.add(
+                game_id=game.game_id,
+                word=game.word,
+                locale=self.__i18n.current_locale,
+            )
 
-        if regex.match(text):
+        if self.__word_matcher.match(game_id=game.game_id, text=text):
             await self.__game_finished(game=game)
 
             _ = self.__i18n.gettext
+            text = _(
+                "Correct! Word: <b>{word}</b>.\nType /game to start new game"
+            ).format(word=game.word)
             try:
-                await self.__bot.send_message(
-                    chat_id=group_id,
-                    reply_to_message_id=message_id,
-                    text=_(
-                        "Correct! Word: <b>{word}</b>.\nType /game to start new game"
-                    ).format(word=game.word),
+                await self.__outbound.call(
+                    group_id,
+                    Priority.Result,
+                    lambda: self.__bot.send_message(
+                        chat_id=group_id, reply_to_message_id=message_id, text=text
+                    ),
                 )
             except Exception:
-                pass
+                logger.exception(f"Game {game.game_id} result sending failed")
 
     async def get_word(self, init_data: str, game_id: str) -> GameWordResult:
         """Get current word for game with [game_id]
@@ -335,7 +668,7 @@ class GameController:
         if not safe_init_data:
             return GameWordResult(None, GameWordStatus.NotAuth)
 
-        game = await self.__db.get_game(game_id=game_id)
+        game = await self.__get_game(game_id=game_id)
         if game is None:
             return GameWordResult(None, GameWordStatus.Ended)
 
@@ -352,7 +685,7 @@ class GameController:
             user_id (int): User id
             is_admin (bool): User is admin in group
         """
-        game = await self.__db.get_group_game(group_id=group_id)
+        game = await self.__get_group_game(group_id=group_id)
         if game is None:
             return
 
@@ -362,14 +695,17 @@ class GameController:
         await self.__game_finished(game=game)
 
         _ = self.__i18n.gettext
+        text = _("The game is cancelled. Type /game to create new one")
         try:
-            await self.__bot.send_message(
-                chat_id=group_id,
-                reply_to_message_id=game.message_id,
-                text=_("The game is cancelled. Type /game to create new one"),
+            await self.__outbound.call(
+                group_id,
+                Priority.Result,
+                lambda: self.__bot.send_message(
+                    chat_id=group_id, reply_to_message_id=game.message_id, text=text
+                ),
             )
         except Exception:
-            pass
+            logger.exception(f"Game {game.game_id} cancellation sending failed")
 
     async def delete_game(self, group_id: int) -> None:
         """Delete game for group with [group_id]
@@ -377,20 +713,368 @@ class GameController:
         Args:
             group_id (int): Group id
         """
-        game = await self.__db.get_group_game(group_id=group_id)
+        game = await self.__get_group_game(group_id=group_id)
         if not game:
             return
         await self.__game_finished(game)
 
+    async def __get_game(self, game_id: str) -> Optional[Game]:
+        """Get active game from registry, fallback to database"""
+        entry = self.__games.by_game_id(game_id)
+        if entry:
+            return entry.game
+
+        game = await self.__db.get_game(game_id=game_id)
+        if game:
+            self.__games.put(game)
+        return game
+
+    async def __get_host_game(self, init_data: str, game_id: str) -> Optional[Game]:
+        """Active game with [game_id] hosted by user of [init_data]"""
+        safe_init_data = self.extract_init_data(init_data=init_data)
+        if not safe_init_data:
+            return None
+
+        game = await self.__get_game(game_id=game_id)
+        if game is None or game.owner_id != safe_init_data.user.id:
+            return None
+        return game
+
+    async def __get_group_game(self, group_id: int) -> Optional[Game]:
+        """Get active group game from registry, fallback to database"""
+        entry = self.__games.by_group_id(group_id)
+        if entry:
+            return entry.game
+
+        if self.__games.has_no_game(group_id):
+            return None
+
+        game = await self.__db.get_group_game(group_id=group_id)
+        if game:
+            self.__games.put(game)
+        else:
+            self.__games.mark_no_game(group_id)
+        return game
+
+    async def __publish_canvas(
+        self, game_id: str, image: Union[CanvasImage, StrokesCanvas]
+    ) -> None:
+        """Replace game message photo with [image], resend message on failure"""
+        entry = self.__games.by_game_id(game_id)
+        if entry is None:
+            return
+        game = entry.game
+
+        submitted = image
+        uploaded = isinstance(image, CanvasImage)
+        if isinstance(image, StrokesCanvas):
+            data = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.__canvas_renderer.render,
+                game_id,
+                StrokesSnapshot.of(entry.strokes),
+            )
+            image = CanvasImage(
+                data=data,
+                filename=f"canvas.{self.__canvas_renderer.extension}",
+                digest=canvas_digest(data),
+            )
+
+        if self.__canvas_digests.is_published(game_id, image.digest):
+            return
+
+        # Already uploaded image is sent by `file_id`, without bytes
+        media_image: Union[str, types.BufferedInputFile]
+        file_id = entry.canvas_file_ids.get(image.digest)
+        if file_id:
+            media_image = file_id
+        else:
+            data, filename = image.data, image.filename
+            if uploaded:
+                data = await self.__image_pipeline.normalize(game_id, data)
+                filename = f"canvas.{self.__image_pipeline.extension}"
+            media_image = types.BufferedInputFile(data, filename=filename)
+
+        message = self.__game_message(entry)
+        try_resend = False
+        try:
+            edited = await self.__outbound.call(
+                game.group_id,
+                Priority.Canvas,
+                lambda: self.__bot.edit_message_media(
+                    media=types.InputMediaPhoto(
+                        media=media_image, caption=message.caption
+                    ),
+                    chat_id=game.group_id,
+                    message_id=game.message_id,
+                    reply_markup=message.reply_markup,
+                ),
+            )
+            if isinstance(edited, types.Message):
+                self.__remember_file_id(entry, image.digest, edited)
+        except TelegramRetryAfter:
+            # Resending costs even more quota, edit is retried once chat is unblocked
+            logger.warning(f"Game {game_id} canvas update rate limited, retrying")
+            self.__canvas_updates.retry(game_id, submitted)
+            return
+        except Exception:
+            try_resend = True
+
+        if try_resend:
+            new_message = await self.__outbound.call(
+                game.group_id,
+                Priority.Canvas,
+                lambda: self.__bot.send_photo(
+                    chat_id=game.group_id,
+                    photo=media_image,
+                    caption=message.caption,
+                    reply_markup=message.reply_markup,
+                ),
+            )
+            self.__remember_file_id(entry, image.digest, new_message)
+            await self.__db.update_game_message(
+                game_id=game.id, new_message_id=new_message.message_id
+            )
+            game.message_id = new_message.message_id
+            await self.__publish_state(GameStateChange.MessageUpdated, game)
+
+        self.__canvas_digests.published(game_id, image.digest)
+
+    def __game_message(self, entry: ActiveGame) -> GameMessage:
+        """Game caption and keyboard, built on first use"""
+        if entry.message is None:
+            entry.message = self.__templates.build(
+                entry.game, entry.locale or self.__i18n.current_locale
+            )
+        return entry.message
+
+    def __remember_file_id(
+        self, entry: ActiveGame, digest: int, message: types.Message
+    ) -> None:
+        """Cache `file_id` of canvas photo in [message] under [digest]"""
+        if message.photo:
+            entry.canvas_file_ids[digest] = message.photo[-1].file_id
+
+    async def __notify_already_started(self, game: Game) -> None:
+        _ = self.__i18n.gettext
+        text = _("The game has already started")
+        try:
+            await self.__outbound.call(
+                game.group_id,
+                Priority.Message,
+                lambda: self.__bot.send_message(
+                    chat_id=game.group_id,
+                    reply_to_message_id=game.message_id,
+                    text=text,
+                ),
+            )
+        except Exception:
+            logger.exception(f"Game {game.game_id} notification sending failed")
+
     async def __game_finished(self, game: Game) -> None:
         await self.__db.game_finished(game_id=game.id)
-
-        listener = self.__game_listener.get(game.game_id)
+        self.__forget_game(game)
+        await self.__publish_state(GameStateChange.Finished, game)
+
+    def __forget_game(self, game: Game) -> None:
+        """Drop finished game state of this process, notify listener"""
+        self.__games.remove(game)
+        self.__canvas_updates.discard(game.game_id)
+        self.__canvas_digests.evict(game.game_id)
+        self.__canvas_renderer.evict(game.game_id)
+        self.__word_matcher.remove(game.game_id)
+
+        listener = self.__game_listener.pop(game.game_id, None)
         if listener:
-            await listener.put(GameEvent(GameEventType.Error, GameWordStatus.Ended))
+            listener.put_nowait(GameEvent(GameEventType.Error, GameWordStatus.Ended))
+        self.__broadcast.close(
+            game.game_id, GameEventType.Error, GameWordStatus.Ended
+        )
+
+    async def __publish_event(
+        self, game_id: str, event: GameEvent, session_id: Optional[str] = None
+    ) -> None:
+        """Publish game event to listeners in all processes"""
+        await self.__publish(
+            game_id, {"type": event.type, "data": event.data, "session_id": session_id}
+        )
+
+    async def __publish_state(
+        self, change: GameStateChange, game: Game, locale: Optional[str] = None
+    ) -> None:
+        """Publish game change to other processes"""
+        await self.__publish(
+            game.game_id, {"state": change, "game": asdict(game), "locale": locale}
+        )
+
+    async def __publish(self, game_id: str, message: dict[str, Any]) -> None:
+        payload = json.dumps(message)
+        try:
+            await self.__event_bus.publish(game_id, payload)
+        except Exception:
+            logger.exception(f"Publishing {payload} failed for {game_id}")
+            # Deliver to this process at least
+            self.__on_game_event(game_id, payload)
+
+    def __strokes_payloads(
+        self, game_id: str, ops: List[StrokeOp], width: int, height: int
+    ) -> List[str]:
+        """Encoded strokes messages, batch is split until each fits event bus limit
+
+        Raises:
+            ValueError: Operation doesn't fit and can't be split
+        """
+        payload = json.dumps(
+            {
+                "strokes": dump_strokes(ops),
+                "width": width,
+                "height": height,
+            }
+        )
+        if self.__event_bus.fits(game_id, payload):
+            return [payload]
+
+        head, tail = split_strokes(ops)
+        return self.__strokes_payloads(
+            game_id, head, width, height
+        ) + self.__strokes_payloads(game_id, tail, width, height)
+
+    def __on_game_event(self, game_id: str, payload: str) -> None:
+        """Apply game change or deliver game event to listener of this process"""
+        message = json.loads(payload)
+        if "state" in message:
+            self.__on_game_state(
+                GameStateChange(message["state"]),
+                Game(**message["game"]),
+                message.get("locale"),
+            )
+            return
+
+        # Strokes, subscriptions and subscriber heartbeats of any process
+        entry = self.__games.by_game_id(game_id)
+        if entry:
+            entry.last_activity = time.time()
+        if "touch" in message:
+            return
+
+        if "strokes" in message:
+            if entry and entry.strokes.append(
+                parse_strokes(message["strokes"]),
+                width=message["width"],
+                height=message["height"],
+            ):
+                # One process publishes game strokes to chat
+                if self.is_canvas_publisher(game_id):
+                    self.__canvas_updates.submit(
+                        game_id, StrokesCanvas(revision=entry.strokes.revision)
+                    )
+                # Spectators of every process
+                self.__broadcast.publish(
+                    game_id,
+                    "strokes",
+                    lambda: json.dumps(
+                        {
+                            "strokes": message["strokes"],
+                            "width": message["width"],
+                            "height": message["height"],
+                        }
+                    ),
+                )
+            return
+
+        listener = self.__game_listener.get(game_id)
+        if not listener:
+            return
+
+        event = GameEvent(GameEventType(message["type"]), message["data"])
+
+        if event.type == GameEventType.Disconnect:
+            # Same session connected again, maybe to another process
+            if (
+                listener.session_id == message["session_id"]
+                and listener.request_id != event.data
+            ):
+                listener.put_nowait(GameEventType.Disconnect)
+                self.__game_listener.pop(game_id, None)
+            return
+
+        listener.put_nowait(event)
+        if event.type == GameEventType.Error:
+            self.__game_listener.pop(game_id, None)
+
+    def __on_game_state(
+        self, change: GameStateChange, game: Game, locale: Optional[str]
+    ) -> None:
+        if change == GameStateChange.Finished:
+            self.__forget_game(game)
+            return
 
-        self.__game_listener.pop(game.game_id, None)
-        self.__regex_cache.pop(game.game_id, None)
+        entry = self.__games.by_game_id(game.game_id)
+        if entry:
+            entry.game.message_id = game.message_id
+        else:
+            entry = self.__games.put(game)
+        entry.locale = entry.locale or locale
+
+    async def __sweep(self, reap_stale_games: bool) -> None:
+        """Periodically share subscriber activity and finish stale games"""
+        while True:
+            await asyncio.sleep(self.__stale_game_sweep_interval_sec)
+            try:
+                # Subscribers of this process keep their games alive everywhere
+                for game_id in list(self.__game_listener):
+                    await self.__publish(game_id, {"touch": True})
+                if reap_stale_games:
+                    await self.__reap_stale_games()
+            except Exception:
+                logger.exception("Stale games sweep failed")
+
+    async def __reap_stale_games(self) -> None:
+        """Finish up to sweep limit games idle past TTL, in one database statement"""
+        stale = [
+            entry
+            for entry in self.__games.idle(
+                since=time.time() - self.__stale_game_ttl_sec,
+                limit=self.__stale_game_sweep_limit,
+            )
+            if entry.game.game_id not in self.__game_listener
+        ]
+        if not stale:
+            return
+
+        finished = set(await self.__db.finish_games([e.game.id for e in stale]))
+        _ = self.__i18n.gettext
+        for entry in stale:
+            game = entry.game
+            # Finished already, e.g. by another process, when not in [finished]
+            self.__forget_game(game)
+            if game.id not in finished:
+                continue
+            await self.__publish_state(GameStateChange.Finished, game)
+
+            text = _(
+                "The game has ended due to inactivity. Type /game to create new one",
+                locale=entry.locale or self.__i18n.default_locale,
+            )
+            task = asyncio.create_task(self.__notify_group(game, text))
+            self.__notifications.add(task)
+            task.add_done_callback(self.__notifications.discard)
+
+        logger.info(f"Stale games finished: {len(finished)} of {len(stale)}")
+
+    async def __notify_group(self, game: Game, text: str) -> None:
+        try:
+            await self.__outbound.call(
+                game.group_id,
+                Priority.Message,
+                lambda: self.__bot.send_message(
+                    chat_id=game.group_id,
+                    reply_to_message_id=game.message_id,
+                    text=text,
+                ),
+            )
+        except Exception:
+            logger.exception(f"Game {game.game_id} notification sending failed")
 
     def __generate_game_id(self) -> str:
         return f"gameId__{uuid.uuid4()}"
@@ -0,0 +1,137 @@
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from cachetools import LRUCache, TTLCache
+
+from database import Game
+from services.messagetemplates import GameMessage
+from services.strokelog import StrokeLog
+
+
+@dataclass
+class ActiveGame:
+    """Active game entry with in-process state attached to it"""
+
+    game: Game
+    strokes: StrokeLog = field(default_factory=StrokeLog)
+    # Group locale, if known to this process
+    locale: Optional[str] = None
+    # Caption and keyboard, built once
+    message: Optional[GameMessage] = None
+    # Last canvas update or subscriber activity, unix time
+    last_activity: float = field(default_factory=time.time)
+    # Canvas digest to Telegram `file_id` of uploaded photo, reused on resends
+    canvas_file_ids: LRUCache[int, str] = field(
+        default_factory=lambda: LRUCache(maxsize=4)
+    )
+
+
+class ActiveGameRegistry:
+    def __init__(
+        self, negative_ttl_sec: float = 60, negative_cache_size: int = 100_000
+    ) -> None:
+        """In-process registry of active (not finished) games
+
+        Lookups go to the registry first. Groups known to have no game
+        are kept in a negative cache, so they cost no database queries.
+
+        Args:
+            negative_ttl_sec (float, optional): Negative cache entry lifetime. Defaults to 60.
+            negative_cache_size (int, optional): Negative cache capacity. Defaults to 100_000.
+        """
+        self.__by_game_id: Dict[str, ActiveGame] = {}
+        self.__by_group_id: Dict[int, ActiveGame] = {}
+        self.__no_game_groups = TTLCache[int, bool](
+            maxsize=negative_cache_size, ttl=negative_ttl_sec
+        )
+
+    def __len__(self) -> int:
+        return len(self.__by_game_id)
+
+    def warm(self, games: Iterable[Game]) -> None:
+        """Load active games, e.g. from database at startup
+
+        Args:
+            games (Iterable[Game]): Active games
+        """
+        for game in games:
+            self.put(game)
+
+    def put(self, game: Game) -> ActiveGame:
+        """Register active game
+
+        Args:
+            game (Game): Active game
+
+        Returns:
+            ActiveGame: Registry entry
+        """
+        previous = self.__by_group_id.get(game.group_id)
+        if previous and previous.game.game_id != game.game_id:
+            self.__by_game_id.pop(previous.game.game_id, None)
+
+        entry = self.__by_game_id.get(game.game_id)
+        if entry:
+            entry.game = game
+        else:
+            entry = ActiveGame(game=game)
+            self.__by_game_id[game.game_id] = entry
+
+        self.__by_group_id[game.group_id] = entry
+        self.__no_game_groups.pop(game.group_id, None)
+        return entry
+
+    def remove(self, game: Game) -> Optional[ActiveGame]:
+        """Unregister finished game
+
+        Args:
+            game (Game): Finished game
+
+        Returns:
+            Optional[ActiveGame]: Removed registry entry
+        """
+        entry = self.__by_game_id.pop(game.game_id, None)
+        group_entry = self.__by_group_id.get(game.group_id)
+        if group_entry and group_entry.game.game_id == game.game_id:
+            self.__by_group_id.pop(game.group_id, None)
+        self.mark_no_game(game.group_id)
+        return entry
+
+    def by_game_id(self, game_id: str) -> Optional[ActiveGame]:
+        """Get registry entry by game id"""
+        return self.__by_game_id.get(game_id)
+
+    def by_group_id(self, group_id: int) -> Optional[ActiveGame]:
+        """Get registry entry by group id"""
+        return self.__by_group_id.get(group_id)
+
+    def has_no_game(self, group_id: int) -> bool:
+        """Group is known to have no active game"""
+        return group_id in self.__no_game_groups
+
+    def mark_no_game(self, group_id: int) -> None:
+        """Remember that group has no active game"""
+        self.__no_game_groups[group_id] = True
+
+    def entries(self) -> List[ActiveGame]:
+        """Snapshot of all registry entries"""
+        return list(self.__by_game_id.values())
+
+    def idle(self, since: float, limit: int) -> List[ActiveGame]:
+        """Entries without activity since [since], at most [limit]
+
+        Args:
+            since (float): Unix time
+            limit (int): Entries limit
+
+        Returns:
+            List[ActiveGame]: Idle entries
+        """
+        return list(
+            itertools.islice(
+                (e for e in self.__by_game_id.values() if e.last_activity < since),
+                limit,
+            )
+        )
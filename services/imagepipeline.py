@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+from cachetools import LRUCache
+from PIL import Image
+
+# Decoded image size limit, rejects decompression bombs
+MAX_PIXELS = 4096 * 4096
+
+
+def normalize_image(
+    data: bytes,
+    max_side: int,
+    max_bytes: int,
+    image_format: str = "JPEG",
+    quality: int = 80,
+    min_quality: int = 30,
+) -> bytes:
+    """Downscale, flatten transparency onto white and recompress image
+    until it fits [max_bytes]
+
+    Args:
+        data (bytes): Source image
+        max_side (int): Larger side limit, in pixels
+        max_bytes (int): Output size budget
+        image_format (str, optional): Output Pillow format. Defaults to "JPEG".
+        quality (int, optional): Initial quality. Defaults to 80.
+        min_quality (int, optional): Quality floor before further downscaling. Defaults to 30.
+
+    Raises:
+        ValueError: Image is too large or can't be decoded
+
+    Returns:
+        bytes: Encoded image
+    """
+    with Image.open(BytesIO(data)) as source:
+        if source.width * source.height > MAX_PIXELS:
+            raise ValueError(f"Image is too large: {source.width}x{source.height}")
+        source.load()
+
+        image = source.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    side = max_side
+    while True:
+        image.thumbnail((side, side))
+        for q in range(quality, min_quality - 1, -10):
+            output = BytesIO()
+            image.save(output, format=image_format, quality=q)
+            if output.tell() <= max_bytes or side <= 64:
+                return output.getvalue()
+        side = max(int(max(image.size) * 0.75), 64)
+
+
+@dataclass
+class ImageStats:
+    images: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+class ImagePipeline:
+    def __init__(
+        self,
+        max_side: int = 800,
+        max_bytes: int = 256 * 1024,
+        image_format: str = "JPEG",
+        quality: int = 80,
+        workers: int = 1,
+        stats_size: int = 10_000,
+    ) -> None:
+        """Uploaded images normalization in a process pool,
+        so decoding and encoding never block event loop
+
+        Args:
+            max_side (int, optional): Larger side limit, in pixels. Defaults to 800.
+            max_bytes (int, optional): Output size budget. Defaults to 256 KiB.
+            image_format (str, optional): Output Pillow format. Defaults to "JPEG".
+            quality (int, optional): Initial quality. Defaults to 80.
+            workers (int, optional): Pool processes. Defaults to 1.
+            stats_size (int, optional): Per key stats kept. Defaults to 10_000.
+        """
+        self.__max_side = max_side
+        self.__max_bytes = max_bytes
+        self.__image_format = image_format
+        self.__quality = quality
+        self.__executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.__stats = LRUCache[str, ImageStats](maxsize=stats_size)
+        self.total = ImageStats()
+
+    @property
+    def extension(self) -> str:
+        """Output image file extension"""
+        return self.__image_format.lower()
+
+    def stats(self, key: str) -> Optional[ImageStats]:
+        """Bytes in vs. bytes out of [key], e.g. game id"""
+        return self.__stats.get(key)
+
+    async def normalize(self, key: str, data: bytes) -> bytes:
+        """Normalize image, see `normalize_image`
+
+        Args:
+            key (str): Stats key, e.g. game id
+            data (bytes): Source image
+
+        Returns:
+            bytes: Encoded image
+        """
+        output = await asyncio.get_running_loop().run_in_executor(
+            self.__executor,
+            normalize_image,
+            data,
+            self.__max_side,
+            self.__max_bytes,
+            self.__image_format,
+            self.__quality,
+        )
+
+        stats = self.__stats.get(key)
+        if stats is None:
+            stats = self.__stats[key] = ImageStats()
+        for s in (stats, self.total):
+            s.images += 1
+            s.bytes_in += len(data)
+            s.bytes_out += len(output)
+
+        return output
+
+    def close(self) -> None:
+        """Shutdown process pool"""
+        self.__executor.shutdown(wait=False, cancel_futures=True)
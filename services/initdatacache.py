@@ -0,0 +1,58 @@
+import hashlib
+import time
+from typing import Optional
+
+from aiogram.utils.web_app import WebAppInitData, safe_parse_webapp_init_data
+from cachetools import TLRUCache
+
+
+class InitDataCache:
+    def __init__(
+        self, token: str, maxsize: int = 10_000, max_age_sec: float = 24 * 60 * 60
+    ) -> None:
+        """Cache of validated Telegram Web App initData
+
+        Same initData string is reused for the whole mini app session,
+        so its HMAC validation result is cached by the string digest.
+        Entry expires [max_age_sec] after initData `auth_date`.
+
+        Args:
+            token (str): Bot token
+            maxsize (int, optional): Cache capacity. Defaults to 10_000.
+            max_age_sec (float, optional): Entry lifetime since `auth_date`. Defaults to 1 day.
+        """
+        self.__token = token
+        self.__max_age_sec = max_age_sec
+        self.__cache = TLRUCache[bytes, WebAppInitData](
+            maxsize=maxsize, ttu=self.__expires_at, timer=time.time
+        )
+
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+    def parse(self, init_data: str) -> Optional[WebAppInitData]:
+        """Validate and parse Telegram Web App initData safe string
+
+        Args:
+            init_data (str): Telegram Web App initData safe string
+
+        Returns:
+            Optional[WebAppInitData]: WebAppInitData, `None` if invalid
+        """
+        key = hashlib.blake2b(init_data.encode(), digest_size=32).digest()
+        safe_init_data = self.__cache.get(key)
+        if safe_init_data is not None:
+            return safe_init_data
+
+        try:
+            safe_init_data = safe_parse_webapp_init_data(
+                token=self.__token, init_data=init_data
+            )
+        except ValueError:
+            return None
+
+        self.__cache[key] = safe_init_data
+        return safe_init_data
+
+    def __expires_at(self, _key: bytes, value: WebAppInitData, _now: float) -> float:
+        return value.auth_date.timestamp() + self.__max_age_sec
@@ -0,0 +1,71 @@
+from typing import Dict, NamedTuple
+
+from aiogram import types
+from aiogram.utils.i18n import I18n
+
+from database import Game
+
+
+class GameMessage(NamedTuple):
+    """Game message photo caption and keyboard"""
+
+    caption: str
+    reply_markup: types.InlineKeyboardMarkup
+
+
+class _LocaleTemplate(NamedTuple):
+    caption: str
+    button_text: str
+
+
+class GameMessageTemplates:
+    def __init__(self, i18n: I18n, web_app_url: str) -> None:
+        """Game message templates, translated once per locale
+
+        Args:
+            i18n (I18n): i18n localization instance
+            web_app_url (str): Telegram Web App url
+        """
+        self.__i18n = i18n
+        self.__start_url = f"{web_app_url}?startapp="
+        self.__templates: Dict[str, _LocaleTemplate] = {}
+
+    def build(self, game: Game, locale: str) -> GameMessage:
+        """Build game message, meant to be cached per game
+
+        Args:
+            game (Game): Game
+            locale (str): Group locale
+
+        Returns:
+            GameMessage: Caption and keyboard
+        """
+        template = self.__template(locale)
+        return GameMessage(
+            caption=template.caption.format(
+                owner_id=game.owner_id, owner_name=game.owner_name
+            ),
+            reply_markup=types.InlineKeyboardMarkup(
+                inline_keyboard=[
+                    [
+                        types.InlineKeyboardButton(
+                            text=template.button_text,
+                            url=f"{self.__start_url}{game.game_id}",
+                        )
+                    ]
+                ]
+            ),
+        )
+
+    def __template(self, locale: str) -> _LocaleTemplate:
+        template = self.__templates.get(locale)
+        if template is None:
+            _ = self.__i18n.gettext
+            template = self.__templates[locale] = _LocaleTemplate(
+                caption=_(
+                    "<a href='tg://user?id={owner_id}'>{owner_name}</a> draws for guessing",
+                    locale=locale,
+                ),
+                button_text=_("Start drawing", locale=locale),
+            )
+        return template
@@ -0,0 +1,256 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from logger import logger
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Outbound request priority, lower is sent first"""
+
+    Result = 0
+    Message = 1
+    Canvas = 2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Token bucket rate limiter
+
+        Args:
+            rate (float): Tokens refilled per second
+            capacity (float): Bucket size, i.e. allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available"""
+        self.__refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self.__refill(now)
+        self.tokens -= 1
+
+    def __refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+
+@dataclass
+class _Request:
+    chat_id: int
+    priority: Priority
+    call: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    retries: int = 0
+
+
+@dataclass
+class _ChatState:
+    bucket: TokenBucket
+    # Monotonic time before which chat must not be called, `retry_after` backoff
+    blocked_until: float = 0
+
+
+@dataclass
+class OutboundStats:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    depth: Dict[Priority, int] = field(default_factory=dict)
+
+
+class OutboundScheduler:
+    def __init__(
+        self,
+        global_rate: float = 25,
+        chat_rate: float = 20 / 60,
+        chat_burst: float = 3,
+        max_retries: int = 3,
+        chats_size: int = 10_000,
+    ) -> None:
+        """Outbound Telegram API requests scheduler
+
+        Requests are sent in priority order, within per-chat and global
+        token bucket budgets. `TelegramRetryAfter` blocks the chat
+        for `retry_after` seconds and requeues the request.
+        Budgets are of this process only, other processes have their own.
+
+        Args:
+            global_rate (float, optional): Requests per second, all chats. Defaults to 25.
+            chat_rate (float, optional): Requests per second, per chat. Defaults to 20 per minute.
+            chat_burst (float, optional): Per chat burst. Defaults to 3.
+            max_retries (int, optional): `retry_after` retries before failing request. Defaults to 3.
+            chats_size (int, optional): Idle chat states kept before cleanup. Defaults to 10_000.
+        """
+        self.__global = TokenBucket(rate=global_rate, capacity=global_rate)
+        self.__chat_rate = chat_rate
+        self.__chat_burst = chat_burst
+        self.__max_retries = max_retries
+        self.__chats_size = chats_size
+        self.__chats: Dict[int, _ChatState] = {}
+        self.__queues: Dict[Priority, Deque[_Request]] = {
+            priority: deque() for priority in Priority
+        }
+        self.__wakeup = asyncio.Event()
+        self.__worker: Optional[asyncio.Task] = None
+        self.__inflight: set[asyncio.Task] = set()
+        self.__stats = OutboundStats()
+
+    @property
+    def stats(self) -> OutboundStats:
+        """Counters and current queue depth per priority"""
+        self.__stats.depth = {
+            priority: len(queue) for priority, queue in self.__queues.items()
+        }
+        return self.__stats
+
+    async def call(
+        self, chat_id: int, priority: Priority, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Schedule Telegram API call and wait for its result
+
+        Args:
+            chat_id (int): Target chat id
+            priority (Priority): Request priority
+            call (Callable[[], Awaitable[T]]): Request factory, invoked on every attempt
+
+        Raises:
+            TelegramRetryAfter: Retries are exhausted
+            Exception: Request errors
+
+        Returns:
+            T: Request result
+        """
+        if self.__worker is None or self.__worker.done():
+            self.__worker = asyncio.create_task(self.__run())
+
+        future = asyncio.get_running_loop().create_future()
+        self.__queues[priority].append(
+            _Request(chat_id=chat_id, priority=priority, call=call, future=future)
+        )
+        self.__wakeup.set()
+        return await future
+
+    async def close(self) -> None:
+        """Stop sending, pending requests are cancelled"""
+        if self.__worker:
+            self.__worker.cancel()
+            await asyncio.gather(self.__worker, return_exceptions=True)
+            self.__worker = None
+        for task in list(self.__inflight):
+            task.cancel()
+        await asyncio.gather(*self.__inflight, return_exceptions=True)
+        for queue in self.__queues.values():
+            while queue:
+                queue.popleft().future.cancel()
+
+    async def __run(self) -> None:
+        while True:
+            self.__wakeup.clear()
+            delay = self.__dispatch_ready()
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def __dispatch_ready(self) -> Optional[float]:
+        """Start every request allowed by budgets
+
+        Returns:
+            Optional[float]: Seconds until next request may be allowed, `None` if queues are empty
+        """
+        next_delay: Optional[float] = None
+
+        def wait_at_most(delay: float) -> None:
+            nonlocal next_delay
+            next_delay = delay if next_delay is None else min(next_delay, delay)
+
+        for queue in self.__queues.values():
+            for request in list(queue):
+                if request.future.done():
+                    queue.remove(request)
+                    continue
+
+                now = time.monotonic()
+                global_delay = self.__global.delay(now)
+                if global_delay > 0:
+                    wait_at_most(global_delay)
+                    return next_delay
+
+                chat = self.__chat(request.chat_id)
+                chat_delay = max(chat.blocked_until - now, chat.bucket.delay(now))
+                if chat_delay > 0:
+                    wait_at_most(chat_delay)
+                    continue
+
+                self.__global.take(now)
+                chat.bucket.take(now)
+                queue.remove(request)
+                task = asyncio.create_task(self.__send(request))
+                self.__inflight.add(task)
+                task.add_done_callback(self.__inflight.discard)
+
+        return next_delay
+
+    async def __send(self, request: _Request) -> None:
+        try:
+            result = await request.call()
+        except TelegramRetryAfter as e:
+            chat = self.__chat(request.chat_id)
+            chat.blocked_until = max(
+                chat.blocked_until, time.monotonic() + e.retry_after
+            )
+            if request.retries < self.__max_retries and not request.future.done():
+                logger.warning(
+                    f"Chat {request.chat_id} is rate limited for {e.retry_after}s, retrying"
+                )
+                request.retries += 1
+                self.__stats.retried += 1
+                # Retried request keeps its turn within priority
+                self.__queues[request.priority].appendleft(request)
+                self.__wakeup.set()
+                return
+            self.__fail(request, e)
+        except Exception as e:
+            self.__fail(request, e)
+        else:
+            self.__stats.sent += 1
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def __fail(self, request: _Request, e: Exception) -> None:
+        self.__stats.failed += 1
+        if not request.future.done():
+            request.future.set_exception(e)
+
+    def __chat(self, chat_id: int) -> _ChatState:
+        chat = self.__chats.get(chat_id)
+        if chat is None:
+            if len(self.__chats) >= self.__chats_size:
+                self.__cleanup_chats()
+            chat = self.__chats[chat_id] = _ChatState(
+                bucket=TokenBucket(rate=self.__chat_rate, capacity=self.__chat_burst)
+            )
+        return chat
+
+    def __cleanup_chats(self) -> None:
+        """Drop states of chats with full buckets and no backoff, they are equal to new ones"""
+        now = time.monotonic()
+        for chat_id, chat in list(self.__chats.items()):
+            chat.bucket.delay(now)
+            if chat.bucket.tokens >= chat.bucket.capacity and chat.blocked_until <= now:
+                del self.__chats[chat_id]
@@ -0,0 +1,204 @@
+import threading
+from functools import lru_cache
+from io import BytesIO
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+from PIL import Image
+
+from services.strokelog import Stroke, StrokeLog
+
+Color = Tuple[int, int, int]
+
+BACKGROUND: Color = (255, 255, 255)
+
+
+@lru_cache(maxsize=256)
+def parse_color(color: str) -> Color:
+    """`#rrggbb` into RGB tuple"""
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+class StrokesSnapshot(NamedTuple):
+    """Immutable view of `StrokeLog`, safe to render outside event loop"""
+
+    generation: int
+    width: int
+    height: int
+    strokes: List[Stroke]
+
+    @classmethod
+    def of(cls, log: StrokeLog) -> "StrokesSnapshot":
+        return cls(log.generation, log.width, log.height, list(log.strokes))
+
+
+class Raster:
+    def __init__(self, width: int, height: int, scale: float) -> None:
+        """RGB pixel buffer with strokes drawing
+
+        Args:
+            width (int): Width, in pixels
+            height (int): Height, in pixels
+            scale (float): Stroke coordinates scale
+        """
+        self.pixels = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+        self.scale = scale
+        # Drawn strokes bounding box: x1, y1, x2, y2
+        self.bounds: Optional[List[int]] = None
+
+    def draw_stroke(self, stroke: Stroke) -> None:
+        """Draw stroke as polyline with round caps and joins"""
+        points = np.frombuffer(stroke.points, dtype=np.float32).reshape(-1, 2)
+        points = points * self.scale
+        radius = max(stroke.size * self.scale / 2, 0.5)
+        color = parse_color(stroke.color)
+
+        if len(points) == 1:
+            self.draw_segment(points[0], points[0], radius, color)
+        for start, end in zip(points[:-1], points[1:]):
+            self.draw_segment(start, end, radius, color)
+
+    def draw_segment(
+        self, start: np.ndarray, end: np.ndarray, radius: float, color: Color
+    ) -> None:
+        """Draw thick segment (disc when [start] equals [end])"""
+        height, width, _ = self.pixels.shape
+        x1 = max(int(np.floor(min(start[0], end[0]) - radius)), 0)
+        y1 = max(int(np.floor(min(start[1], end[1]) - radius)), 0)
+        x2 = min(int(np.ceil(max(start[0], end[0]) + radius)) + 1, width)
+        y2 = min(int(np.ceil(max(start[1], end[1]) + radius)) + 1, height)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        ys, xs = np.ogrid[y1:y2, x1:x2]
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        length_sq = dx * dx + dy * dy
+        if length_sq > 0:
+            t = np.clip(((xs - start[0]) * dx + (ys - start[1]) * dy) / length_sq, 0, 1)
+        else:
+            t = 0
+        dist_x = xs - (start[0] + t * dx)
+        dist_y = ys - (start[1] + t * dy)
+        mask = dist_x * dist_x + dist_y * dist_y <= radius * radius
+
+        self.pixels[y1:y2, x1:x2][mask] = color
+
+        if self.bounds is None:
+            self.bounds = [x1, y1, x2, y2]
+        else:
+            self.bounds[0] = min(self.bounds[0], x1)
+            self.bounds[1] = min(self.bounds[1], y1)
+            self.bounds[2] = max(self.bounds[2], x2)
+            self.bounds[3] = max(self.bounds[3], y2)
+
+
+class _RasterState(NamedTuple):
+    generation: int
+    width: int
+    height: int
+    raster: Raster
+    # Strokes of generation already drawn
+    applied: int
+
+
+class CanvasRenderer:
+    def __init__(
+        self,
+        raster_side: int = 1280,
+        output_side: int = 800,
+        image_format: str = "JPEG",
+        quality: int = 80,
+        padding: int = 18,
+        cache_size: int = 64,
+    ) -> None:
+        """Renders game stroke logs into images
+
+        Rasters are kept per game and replayed incrementally:
+        only strokes added since the previous render are drawn.
+
+        Args:
+            raster_side (int, optional): Raster larger side limit, in pixels. Defaults to 1280.
+            output_side (int, optional): Output image larger side limit, in pixels. Defaults to 800.
+            image_format (str, optional): Output Pillow format, e.g. JPEG or WEBP. Defaults to "JPEG".
+            quality (int, optional): Output quality. Defaults to 80.
+            padding (int, optional): Padding around drawing bounds, in raster pixels. Defaults to 18.
+            cache_size (int, optional): Rasters kept in memory. Defaults to 64.
+        """
+        self.__raster_side = raster_side
+        self.__output_side = output_side
+        self.__image_format = image_format
+        self.__quality = quality
+        self.__padding = padding
+        self.__rasters = LRUCache[str, _RasterState](maxsize=cache_size)
+        self.__rasters_lock = threading.Lock()
+
+    @property
+    def extension(self) -> str:
+        """Output image file extension"""
+        return self.__image_format.lower()
+
+    def evict(self, key: str) -> None:
+        """Drop raster"""
+        with self.__rasters_lock:
+            self.__rasters.pop(key, None)
+
+    def render(self, key: str, snapshot: StrokesSnapshot) -> bytes:
+        """Render strokes, reusing raster of previous render of [key].
+        Thread-safe for different keys.
+
+        Args:
+            key (str): Raster key, e.g. game id
+            snapshot (StrokesSnapshot): Strokes
+
+        Returns:
+            bytes: Encoded image, cropped to drawing bounds
+        """
+        with self.__rasters_lock:
+            state = self.__rasters.get(key)
+        if (
+            state is None
+            or state.generation != snapshot.generation
+            or state.width != snapshot.width
+            or state.height != snapshot.height
+            or state.applied > len(snapshot.strokes)
+        ):
+            scale = min(
+                1.0, self.__raster_side / max(snapshot.width, snapshot.height, 1)
+            )
+            state = _RasterState(
+                generation=snapshot.generation,
+                width=snapshot.width,
+                height=snapshot.height,
+                raster=Raster(
+                    width=max(int(snapshot.width * scale), 1),
+                    height=max(int(snapshot.height * scale), 1),
+                    scale=scale,
+                ),
+                applied=0,
+            )
+
+        for stroke in snapshot.strokes[state.applied:]:
+            state.raster.draw_stroke(stroke)
+        state = state._replace(applied=len(snapshot.strokes))
+        with self.__rasters_lock:
+            self.__rasters[key] = state
+
+        return self.__encode(state.raster)
+
+    def __encode(self, raster: Raster) -> bytes:
+        height, width, _ = raster.pixels.shape
+        pixels = raster.pixels
+        if raster.bounds:
+            x1, y1, x2, y2 = raster.bounds
+            pixels = pixels[
+                max(y1 - self.__padding, 0): min(y2 + self.__padding, height),
+                max(x1 - self.__padding, 0): min(x2 + self.__padding, width),
+            ]
+
+        image = Image.fromarray(pixels, mode="RGB")
+        image.thumbnail((self.__output_side, self.__output_side))
+
+        output = BytesIO()
+        image.save(output, format=self.__image_format, quality=self.__quality)
+        return output.getvalue()
@@ -0,0 +1,166 @@
+import math
+import re
+from array import array
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+_COLOR = re.compile(r"^#[0-9a-fA-F]{6}$")
+
+MAX_STROKE_SIZE = 64
+# Host request limits, serialized batch is split by event bus message size separately
+MAX_BATCH_POINTS = 512
+MAX_BATCH_OPS = 64
+
+
+class Stroke(NamedTuple):
+    color: str
+    size: float
+    # Flat x0, y0, x1, y1, ... in host canvas pixels
+    points: array
+
+
+# `None` stands for canvas clear
+StrokeOp = Optional[Stroke]
+
+
+def parse_strokes(raw: Any) -> List[StrokeOp]:
+    """Parse and validate strokes batch
+
+    Batch is a list of `{"c": "#rrggbb", "s": size, "p": [x0, y0, x1, y1, ...]}`
+    strokes and `{"clear": true}` canvas clears.
+
+    Args:
+        raw (Any): Decoded JSON batch
+
+    Raises:
+        ValueError: Malformed batch
+
+    Returns:
+        List[StrokeOp]: Stroke operations
+    """
+    if not isinstance(raw, list):
+        raise ValueError("Strokes batch must be a list")
+    if len(raw) > MAX_BATCH_OPS:
+        raise ValueError("Too many operations in batch")
+
+    ops: List[StrokeOp] = []
+    total_points = 0
+    for item in raw:
+        if not isinstance(item, dict):
+            raise ValueError("Stroke must be an object")
+
+        if item.get("clear") is True:
+            ops.append(None)
+            continue
+
+        color, size, points = item.get("c"), item.get("s"), item.get("p")
+        if not isinstance(color, str) or not _COLOR.match(color):
+            raise ValueError("Invalid stroke color")
+        if not isinstance(size, (int, float)) or not 0 < size <= MAX_STROKE_SIZE:
+            raise ValueError("Invalid stroke size")
+        if (
+            not isinstance(points, list)
+            or not points
+            or len(points) % 2
+            or not all(
+                isinstance(v, (int, float)) and math.isfinite(v) for v in points
+            )
+        ):
+            raise ValueError("Invalid stroke points")
+
+        total_points += len(points) // 2
+        if total_points > MAX_BATCH_POINTS:
+            raise ValueError("Too many points in batch")
+
+        ops.append(Stroke(color=color, size=float(size), points=array("f", points)))
+
+    return ops
+
+
+def split_strokes(ops: Sequence[StrokeOp]) -> Tuple[List[StrokeOp], List[StrokeOp]]:
+    """Split stroke operations into two non-empty halves
+
+    Single stroke is split by points, tail continues from the last point of head.
+
+    Raises:
+        ValueError: Operations can't be split, single clear or stroke of 1-2 points
+    """
+    if len(ops) > 1:
+        middle = len(ops) // 2
+        return list(ops[:middle]), list(ops[middle:])
+
+    op = ops[0] if ops else None
+    if op is None or len(op.points) < 6:
+        raise ValueError("Stroke operations can't be split")
+    middle = len(op.points) // 4 * 2
+    return (
+        [op._replace(points=op.points[: middle + 2])],
+        [op._replace(points=op.points[middle:])],
+    )
+
+
+def dump_strokes(ops: Sequence[StrokeOp]) -> List[Any]:
+    """Serialize stroke operations back into JSON-compatible batch"""
+    return [
+        {"clear": True}
+        if op is None
+        else {"c": op.color, "s": op.size, "p": [round(v, 1) for v in op.points]}
+        for op in ops
+    ]
+
+
+class StrokeLog:
+    def __init__(self, max_points: int = 100_000) -> None:
+        """Game strokes since last canvas clear
+
+        Args:
+            max_points (int, optional): Log capacity, in points. Defaults to 100_000.
+        """
+        self.max_points = max_points
+        self.strokes: List[Stroke] = []
+        self.points = 0
+        self.width = 0
+        self.height = 0
+        # Incremented on every change
+        self.revision = 0
+        # Incremented on every clear
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.strokes)
+
+    def fits(self, ops: Sequence[StrokeOp]) -> bool:
+        """Check stroke operations fit into log capacity"""
+        return self.__points_after(ops) <= self.max_points
+
+    def append(self, ops: Sequence[StrokeOp], width: int, height: int) -> bool:
+        """Apply stroke operations
+
+        Args:
+            ops (Sequence[StrokeOp]): Stroke operations
+            width (int): Host canvas width
+            height (int): Host canvas height
+
+        Returns:
+            bool: Applied, `False` if log is full
+        """
+        points = self.__points_after(ops)
+        if points > self.max_points:
+            return False
+
+        self.width = width
+        self.height = height
+        for op in ops:
+            if op is None:
+                self.strokes.clear()
+                self.generation += 1
+            else:
+                self.strokes.append(op)
+        self.points = points
+        self.revision += 1
+        return True
+
+    def __points_after(self, ops: Sequence[StrokeOp]) -> int:
+        points = self.points
+        for op in ops:
+            points = 0 if op is None else points + len(op.points) // 2
+        return points
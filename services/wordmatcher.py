@@ -0,0 +1,100 @@
+import re
+import unicodedata
+from typing import Dict, NamedTuple, Tuple
+
+# Locale specific letter folding, applied after casefolding
+LOCALE_FOLDS: Dict[str, Dict[int, str]] = {
+    "ru": str.maketrans({"ё": "е"}),
+}
+
+_WORD_TOKEN = re.compile(r"\w+")
+
+
+def normalize(text: str, locale: str = "en") -> str:
+    """Normalize text for comparison: NFKC, casefold, locale folding
+
+    Args:
+        text (str): Text
+        locale (str, optional): Locale language code. Defaults to "en".
+
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    fold = LOCALE_FOLDS.get(locale)
+    if fold:
+        text = text.translate(fold)
+    return text
+
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Split normalized text into word tokens"""
+    return tuple(_WORD_TOKEN.findall(text))
+
+
+class CompiledWord(NamedTuple):
+    # Longest word token, used for fast substring rejection
+    needle: str
+    tokens: Tuple[str, ...]
+    locale: str
+
+
+class WordMatcher:
+    def __init__(self) -> None:
+        """Matches messages against the hidden words of active games.
+
+        Words are normalized once when added. A message matches when it
+        contains the word's tokens as consecutive whole words.
+        """
+        self.__words: Dict[str, CompiledWord] = {}
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.__words
+
+    def __len__(self) -> int:
+        return len(self.__words)
+
+    def add(self, game_id: str, word: str, locale: str = "en") -> None:
+        """Precompile game word
+
+        Args:
+            game_id (str): Game id
+            word (str): Hidden word
+            locale (str, optional): Word locale language code. Defaults to "en".
+        """
+        tokens = tokenize(normalize(word, locale))
+        self.__words[game_id] = CompiledWord(
+            needle=max(tokens, key=len, default=""), tokens=tokens, locale=locale
+        )
+
+    def remove(self, game_id: str) -> None:
+        """Evict game word"""
+        self.__words.pop(game_id, None)
+
+    def match(self, game_id: str, text: str) -> bool:
+        """Check [text] contains game word
+
+        Args:
+            game_id (str): Game id
+            text (str): Message text
+
+        Returns:
+            bool: Word is found
+        """
+        word = self.__words.get(game_id)
+        if word is None or not word.tokens:
+            return False
+
+        text = normalize(text, word.locale)
+        if word.needle not in text:
+            return False
+
+        tokens = tokenize(text)
+        size = len(word.tokens)
+        if size == 1:
+            return word.tokens[0] in tokens
+
+        return any(
+            tokens[idx: idx + size] == word.tokens
+            for idx in range(len(tokens) - size + 1)
+        )
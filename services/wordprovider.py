@@ -1,17 +1,20 @@
+import mmap
 import random
-from typing import NamedTuple, Protocol
+from array import array
+from typing import NamedTuple, Optional, Protocol, Tuple, Union
 
-import aiofiles
+from cachetools import LRUCache
 
-from common.awaitable import aenumerate
+from database import Database
 
 
 class WordProvider(Protocol):
-    async def generate(self, locale: str = "en") -> str:
+    async def generate(self, locale: str = "en", group_id: Optional[int] = None) -> str:
         """Generate word depends on [locale]
 
         Args:
             locale (str, optional): Locale language code. Defaults to "en".
+            group_id (Optional[int], optional): Group id the word is generated for. Defaults to None.
 
         Returns:
             str: Generated word
@@ -22,7 +25,53 @@ class WordProvider(Protocol):
 class FileWords(NamedTuple):
     locale: str
     filepath: str
-    lines: int
+    # Memory-map file instead of loading it, for large dictionaries
+    mmap: bool = False
+
+
+class WordIndex:
+    def __init__(self, filepath: str, use_mmap: bool = False) -> None:
+        """Offsets index of non-empty lines in words file, one word per line
+
+        Args:
+            filepath (str): Words file path
+            use_mmap (bool, optional): Memory-map file instead of loading it. Defaults to False.
+        """
+        self.__buffer: Union[bytes, mmap.mmap] = b""
+        with open(filepath, "rb") as f:
+            if use_mmap:
+                try:
+                    self.__buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Empty file can't be mapped
+                    pass
+            else:
+                self.__buffer = f.read()
+
+        self.__starts = array("Q")
+        self.__ends = array("Q")
+
+        buffer = self.__buffer
+        size = len(buffer)
+        start = 0
+        while start < size:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                end = size
+            if buffer[start:end].strip():
+                self.__starts.append(start)
+                self.__ends.append(end)
+            start = end + 1
+
+    def __len__(self) -> int:
+        return len(self.__starts)
+
+    def __getitem__(self, idx: int) -> str:
+        return (
+            self.__buffer[self.__starts[idx]: self.__ends[idx]]
+            .decode("utf-8-sig" if self.__starts[idx] == 0 else "utf-8")
+            .strip()
+        )
 
 
 class FileWordProvider(WordProvider):
@@ -31,22 +80,86 @@ class FileWordProvider(WordProvider):
     ) -> None:
         """Word provider from local files
 
+        Files are indexed once, on creation.
+
         Args:
             files (*FileWords): Words local files configs.
             default_locale (str, optional): Default language code. Defaults to "en".
             default_word (str, optional): Default word. Defaults to "word".
         """
-        self.__words = {file.locale: file for file in files}
-        self.__default_config = self.__words.get(default_locale)
+        self.__words = {
+            file.locale: WordIndex(file.filepath, use_mmap=file.mmap) for file in files
+        }
+        self.__default_index = self.__words.get(default_locale)
         self.__default_word = default_word
 
-    async def generate(self, locale: str = "en") -> str:
-        word_config = self.__words.get(locale, self.__default_config)
-        word_idx = random.randint(0, word_config.lines)
-        word = self.__default_word
-        async with aiofiles.open(word_config.filepath, mode="r") as f:
-            async for idx, line in aenumerate(f):
-                if idx == word_idx:
-                    word = line
-                    break
-        return word.strip()
+    def word_index(self, locale: str = "en") -> Optional[WordIndex]:
+        """Get words index for [locale], fallback to default locale"""
+        return self.__words.get(locale, self.__default_index)
+
+    async def generate(self, locale: str = "en", group_id: Optional[int] = None) -> str:
+        word_index = self.word_index(locale)
+        if not word_index:
+            return self.__default_word
+        return word_index[random.randrange(len(word_index))]
+
+
+class ShuffledDeck:
+    def __init__(self, seed: int, size: int) -> None:
+        """Words indices permutation of group deck, rebuilt from [seed]
+
+        Args:
+            seed (int): Shuffle seed
+            size (int): Words count
+        """
+        self.seed = seed
+        self.size = size
+        self.__permutation = self.__shuffle(seed, size)
+
+    def __getitem__(self, position: int) -> int:
+        """Word index at deck [position]"""
+        return self.__permutation[position]
+
+    @staticmethod
+    def __shuffle(seed: int, size: int) -> array:
+        permutation = array("H" if size <= 0xFFFF else "I", range(size))
+        random.Random(seed).shuffle(permutation)
+        return permutation
+
+
+class ShuffledDeckWordProvider(WordProvider):
+    def __init__(
+        self, words: FileWordProvider, db: Database, cache_size: int = 1_000
+    ) -> None:
+        """Word provider without repeats within a group until all words are used
+
+        Every group draws from own shuffled deck. Deck cursor lives in database
+        and is advanced atomically, so all processes share it. Only permutations
+        of recently used decks are kept in memory.
+
+        Args:
+            words (FileWordProvider): Words source
+            db (Database): Database instance
+            cache_size (int, optional): In-memory permutations capacity. Defaults to 1_000.
+        """
+        self.__words = words
+        self.__db = db
+        self.__decks = LRUCache[Tuple[int, str], ShuffledDeck](maxsize=cache_size)
+
+    async def generate(self, locale: str = "en", group_id: Optional[int] = None) -> str:
+        word_index = self.__words.word_index(locale)
+        if group_id is None or not word_index:
+            return await self.__words.generate(locale=locale)
+
+        state = await self.__db.draw_word_deck(
+            group_id=group_id,
+            locale=locale,
+            size=len(word_index),
+            seed=random.getrandbits(63),
+        )
+        key = (group_id, locale)
+        deck = self.__decks.get(key)
+        if deck is None or deck.seed != state.seed or deck.size != state.size:
+            deck = self.__decks[key] = ShuffledDeck(seed=state.seed, size=state.size)
+
+        return word_index[deck[state.position - 1]]